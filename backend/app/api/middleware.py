@@ -0,0 +1,53 @@
+"""
+Minimal pure-ASGI CORS middleware.
+
+Starlette's CORSMiddleware builds Request/Response objects and rescans the
+origin list on every request. This app allows "*" anyway, so the whole
+header set can be precomputed as bytes once at init and appended straight
+onto the http.response.start message; preflights short-circuit with a
+canned 204 before reaching the router.
+"""
+
+
+class FastCORS:
+    """ASGI middleware with precomputed CORS headers for a wildcard origin."""
+
+    ALLOW_METHODS = ("GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH")
+
+    def __init__(self, app, max_age: int = 86400):
+        self.app = app
+        self._headers = [
+            (b"access-control-allow-origin", b"*"),
+            (b"access-control-allow-credentials", b"true"),
+            (b"vary", b"Origin"),
+        ]
+        # Joined once here; max_age=86400 lets browsers cache the preflight
+        # for a day, so most OPTIONS round-trips never happen at all
+        self._preflight_headers = self._headers + [
+            (b"access-control-allow-methods", ", ".join(self.ALLOW_METHODS).encode()),
+            (b"access-control-allow-headers", b"*"),
+            (b"access-control-max-age", str(max_age).encode()),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS":
+            request_headers = dict(scope["headers"])
+            if b"access-control-request-method" in request_headers:
+                await send({
+                    "type": "http.response.start",
+                    "status": 204,
+                    "headers": self._preflight_headers,
+                })
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers") or []) + self._headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
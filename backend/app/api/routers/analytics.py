@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any
+from collections import Counter, defaultdict
 import io
 import docx
 import re
@@ -184,12 +185,20 @@ def get_load_factor_analysis(db: Session = Depends(get_db)):
         "underloaded_faculty": []
     }
     
+    # Group entries by teacher/class once (O(E)) instead of re-filtering
+    # the full list inside each loop (O(T*E) / O(C*E))
+    entries_by_teacher = defaultdict(list)
+    entries_by_class = defaultdict(list)
+    for e in entries:
+        entries_by_teacher[e.teacher_id].append(e)
+        entries_by_class[e.class_group_id].append(e)
+
     # Calculate enhanced teacher load with validation
     teacher_load = []
     days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-    
+
     for teacher in teachers:
-        teacher_entries = [e for e in entries if e.teacher_id == teacher.id]
+        teacher_entries = entries_by_teacher.get(teacher.id, [])
         
         # Categorize hours by type
         theory_hours = 0
@@ -355,11 +364,9 @@ def get_load_factor_analysis(db: Session = Depends(get_db)):
                 "utilization": load_percentage
             })
         
-        # Daily distribution
-        daily_load = {}
-        for day in days:
-            day_entries = [e for e in teacher_entries if e.time_slot and e.time_slot.day == day]
-            daily_load[day] = len(day_entries)
+        # Daily distribution: one Counter pass, then O(1) lookups per day
+        day_counts = Counter(e.time_slot.day for e in teacher_entries if e.time_slot)
+        daily_load = {day: day_counts.get(day, 0) for day in days}
         
         # Subject distribution
         subject_distribution = {}
@@ -425,15 +432,13 @@ def get_load_factor_analysis(db: Session = Depends(get_db)):
     max_periods_per_class = 30
     
     for class_group in classes:
-        class_entries = [e for e in entries if e.class_group_id == class_group.id]
+        class_entries = entries_by_class.get(class_group.id, [])
         total_periods = len(class_entries)
         load_percentage = round((total_periods / max_periods_per_class) * 100) if max_periods_per_class > 0 else 0
-        
-        # Daily distribution
-        daily_load = {}
-        for day in days:
-            day_entries = [e for e in class_entries if e.time_slot and e.time_slot.day == day]
-            daily_load[day] = len(day_entries)
+
+        # Daily distribution: one Counter pass, then O(1) lookups per day
+        day_counts = Counter(e.time_slot.day for e in class_entries if e.time_slot)
+        daily_load = {day: day_counts.get(day, 0) for day in days}
         
         # Subject distribution with hours validation
         subject_distribution = {}
@@ -1,5 +1,6 @@
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..schemas import Room, RoomCreate
@@ -8,6 +9,17 @@ from ...infrastructure import models
 
 router = APIRouter()
 
+# Columns matching the Room response schema; projected directly so list
+# reads skip ORM instance hydration and Pydantic re-validation entirely.
+_ROOM_LIST_COLUMNS = (
+    models.Room.id,
+    models.Room.name,
+    models.Room.capacity,
+    models.Room.type,
+    models.Room.resources,
+    models.Room.created_at,
+)
+
 @router.post("/", response_model=Room)
 def create_room(room: RoomCreate, db: Session = Depends(get_db)):
     # Check for duplicate room name
@@ -34,17 +46,21 @@ def read_rooms(
     min_capacity: Optional[int] = Query(None, description="Minimum capacity"),
     db: Session = Depends(get_db)
 ):
-    query = db.query(models.Room)
-    
+    query = db.query(*_ROOM_LIST_COLUMNS)
+
     # Apply filters
     if room_type:
         query = query.filter(models.Room.type == room_type)
-    
+
     if min_capacity is not None:
         query = query.filter(models.Room.capacity >= min_capacity)
-    
-    rooms = query.offset(skip).limit(limit).all()
-    return rooms
+
+    rows = query.offset(skip).limit(limit).all()
+    rooms = [dict(r._mapping) for r in rows]
+    for room in rooms:
+        if room["resources"] is None:
+            room["resources"] = []
+    return ORJSONResponse(rooms)
 
 @router.get("/{room_id}", response_model=Room)
 def get_room(room_id: int, db: Session = Depends(get_db)):
@@ -1,5 +1,6 @@
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..schemas import Subject, SubjectCreate
@@ -8,6 +9,20 @@ from ...infrastructure import models
 
 router = APIRouter()
 
+# Columns matching the Subject response schema; projected directly so list
+# reads skip ORM instance hydration and Pydantic re-validation entirely.
+_SUBJECT_LIST_COLUMNS = (
+    models.Subject.id,
+    models.Subject.name,
+    models.Subject.code,
+    models.Subject.is_lab,
+    models.Subject.credits,
+    models.Subject.required_room_type,
+    models.Subject.duration_slots,
+    models.Subject.teacher_id,
+    models.Subject.created_at,
+)
+
 @router.post("/", response_model=Subject)
 def create_subject(subject: SubjectCreate, db: Session = Depends(get_db)):
     # Check for duplicate subject code
@@ -38,24 +53,24 @@ def read_subjects(
     teacher_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
-    query = db.query(models.Subject)
-    
+    query = db.query(*_SUBJECT_LIST_COLUMNS)
+
     # Apply filters
     if search:
         search_filter = f"%{search}%"
         query = query.filter(
-            (models.Subject.name.ilike(search_filter)) | 
+            (models.Subject.name.ilike(search_filter)) |
             (models.Subject.code.ilike(search_filter))
         )
-    
+
     if is_lab is not None:
         query = query.filter(models.Subject.is_lab == is_lab)
-    
+
     if teacher_id is not None:
         query = query.filter(models.Subject.teacher_id == teacher_id)
-    
-    subjects = query.offset(skip).limit(limit).all()
-    return subjects
+
+    rows = query.offset(skip).limit(limit).all()
+    return ORJSONResponse([dict(r._mapping) for r in rows])
 
 @router.get("/{subject_id}", response_model=Subject)
 def get_subject(subject_id: int, db: Session = Depends(get_db)):
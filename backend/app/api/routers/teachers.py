@@ -1,5 +1,6 @@
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..schemas import Teacher, TeacherCreate
@@ -8,6 +9,17 @@ from ...infrastructure import models
 
 router = APIRouter()
 
+# Columns matching the Teacher response schema; projected directly so list
+# reads skip ORM instance hydration and Pydantic re-validation entirely.
+_TEACHER_LIST_COLUMNS = (
+    models.Teacher.id,
+    models.Teacher.name,
+    models.Teacher.email,
+    models.Teacher.max_hours_per_week,
+    models.Teacher.available_slots,
+    models.Teacher.created_at,
+)
+
 @router.post("/", response_model=Teacher)
 def create_teacher(teacher: TeacherCreate, db: Session = Depends(get_db)):
     # Check for duplicate email
@@ -31,20 +43,33 @@ def read_teachers(
     skip: int = 0, 
     limit: int = 100, 
     search: Optional[str] = Query(None, description="Search by name or email"),
+    has_monday_class: bool = Query(False, description="Only teachers with a Monday class in the timetable"),
     db: Session = Depends(get_db)
 ):
-    query = db.query(models.Teacher)
-    
+    query = db.query(*_TEACHER_LIST_COLUMNS)
+
     # Apply search filter if provided
     if search:
         search_filter = f"%{search}%"
         query = query.filter(
-            (models.Teacher.name.ilike(search_filter)) | 
+            (models.Teacher.name.ilike(search_filter)) |
             (models.Teacher.email.ilike(search_filter))
         )
-    
-    teachers = query.offset(skip).limit(limit).all()
-    return teachers
+
+    # One joined query instead of clients scanning timetable entries
+    if has_monday_class:
+        query = (query
+                 .join(models.TimetableEntry, models.TimetableEntry.teacher_id == models.Teacher.id)
+                 .join(models.TimeSlot, models.TimetableEntry.time_slot_id == models.TimeSlot.id)
+                 .filter(models.TimeSlot.day == "Monday")
+                 .distinct())
+
+    rows = query.offset(skip).limit(limit).all()
+    teachers = [dict(r._mapping) for r in rows]
+    for t in teachers:
+        if t["available_slots"] is None:
+            t["available_slots"] = []
+    return ORJSONResponse(teachers)
 
 @router.get("/{teacher_id}", response_model=Teacher)
 def get_teacher(teacher_id: int, db: Session = Depends(get_db)):
@@ -1,5 +1,6 @@
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List
 from ...infrastructure.database import get_db
@@ -9,37 +10,99 @@ from .. import schemas
 
 router = APIRouter()
 
+def _version_etag(version: models.TimetableVersion) -> str:
+    """Weak ETag for a timetable version, derived from id + last update time."""
+    stamp = version.updated_at or version.created_at
+    if stamp:
+        return f'W/"{version.id}-{int(stamp.timestamp())}"'
+    return f'W/"{version.id}"'
+
 @router.get("/", response_model=List[schemas.TimetableVersionShort])
 def get_all_timetable_versions(db: Session = Depends(get_db)):
     versions = db.query(models.TimetableVersion).order_by(models.TimetableVersion.id.desc()).all()
     return versions
 
 @router.get("/latest", response_model=schemas.TimetableVersion)
-def get_latest_timetable(db: Session = Depends(get_db)):
+def get_latest_timetable(request: Request, response: Response, db: Session = Depends(get_db)):
     latest = TimetableService.get_latest(db)
     if not latest:
         raise HTTPException(status_code=404, detail="No timetables found")
-    
+
+    # Short-circuit before serializing the (large) nested payload
+    etag = _version_etag(latest)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304)
+    response.headers["ETag"] = etag
+
     # Fix None available_slots to empty list
     for entry in latest.entries:
         if entry.teacher and entry.teacher.available_slots is None:
             entry.teacher.available_slots = []
-    
+
     return latest
 
 @router.get("/{id}", response_model=schemas.TimetableVersion)
-def get_timetable_by_id(id: int, db: Session = Depends(get_db)):
+def get_timetable_by_id(id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     version = db.query(models.TimetableVersion).filter(models.TimetableVersion.id == id).first()
     if not version:
         raise HTTPException(status_code=404, detail="Timetable version not found")
-    
+
+    # Short-circuit before serializing the (large) nested payload
+    etag = _version_etag(version)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304)
+    response.headers["ETag"] = etag
+
     # Fix None available_slots to empty list
     for entry in version.entries:
         if entry.teacher and entry.teacher.available_slots is None:
             entry.teacher.available_slots = []
-    
+
     return version
 
+@router.get("/{id}/entries/flat", response_model=List[schemas.TimetableEntryFlat])
+def get_timetable_entries_flat(id: int, db: Session = Depends(get_db)):
+    """Flat entry list for a version: one JOINed projection, no nested models."""
+    version_exists = db.query(models.TimetableVersion.id).filter(models.TimetableVersion.id == id).first()
+    if not version_exists:
+        raise HTTPException(status_code=404, detail="Timetable version not found")
+
+    rows = (
+        db.query(
+            models.TimetableEntry.id,
+            models.TimetableEntry.version_id,
+            models.TimetableEntry.time_slot_id,
+            models.TimetableEntry.subject_id,
+            models.TimetableEntry.room_id,
+            models.TimetableEntry.class_group_id,
+            models.TimetableEntry.teacher_id,
+            models.Subject.name.label("subject_name"),
+            models.Room.name.label("room_name"),
+            models.Teacher.name.label("teacher_name"),
+            models.ClassGroup.name.label("class_group_name"),
+            models.TimeSlot.day,
+            models.TimeSlot.period,
+            models.TimeSlot.start_time,
+            models.TimeSlot.end_time,
+        )
+        .outerjoin(models.Subject, models.TimetableEntry.subject_id == models.Subject.id)
+        .outerjoin(models.Room, models.TimetableEntry.room_id == models.Room.id)
+        .outerjoin(models.Teacher, models.TimetableEntry.teacher_id == models.Teacher.id)
+        .outerjoin(models.ClassGroup, models.TimetableEntry.class_group_id == models.ClassGroup.id)
+        .outerjoin(models.TimeSlot, models.TimetableEntry.time_slot_id == models.TimeSlot.id)
+        .filter(models.TimetableEntry.version_id == id)
+        .all()
+    )
+
+    entries = []
+    for r in rows:
+        entry = dict(r._mapping)
+        start_time = entry.pop("start_time")
+        end_time = entry.pop("end_time")
+        entry["time_slot_label"] = f"{entry['day']} {start_time}-{end_time}" if entry["day"] else None
+        entries.append(entry)
+    return ORJSONResponse(entries)
+
 @router.get("/analytics/{version_id}", response_model=schemas.AnalyticsReport)
 def get_timetable_analytics(version_id: int, db: Session = Depends(get_db)):
     report = TimetableService.get_analytics(db, version_id)
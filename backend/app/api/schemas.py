@@ -1,8 +1,11 @@
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Any
 from datetime import datetime
 
+# ISO calendar date (YYYY-MM-DD); compiled once by pydantic-core in Rust
+DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+
 # --- Shared Bases ---
 
 class TeacherBase(BaseModel):
@@ -57,14 +60,14 @@ class TimeSlotCreate(TimeSlotBase):
 # --- Operation Schemas ---
 
 class HolidayBase(BaseModel):
-    date: str
+    date: str = Field(pattern=DATE_PATTERN)
     name: str
 
 class HolidayCreate(HolidayBase):
     pass
 
 class SubstitutionBase(BaseModel):
-    date: str
+    date: str = Field(pattern=DATE_PATTERN)
     timetable_entry_id: int
     original_teacher_id: int
     substitute_teacher_id: Optional[int] = None
@@ -75,11 +78,11 @@ class SubstitutionCreate(SubstitutionBase):
 
 class Holiday(HolidayBase):
     id: int
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, defer_build=True, frozen=True)
 
 class Substitution(SubstitutionBase):
     id: int
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, defer_build=True, frozen=True)
 
 class BreakDef(BaseModel):
     # Either position (after which period) or start_time (HH:MM) must be provided
@@ -106,33 +109,33 @@ class ScheduleConfigBase(BaseModel):
 class ScheduleConfig(ScheduleConfigBase):
     id: int
     updated_at: datetime
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, defer_build=True, frozen=True)
 
 # --- Response Models ---
 
 class Teacher(TeacherBase):
     id: int
     created_at: datetime
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, defer_build=True, frozen=True)
 
 class Subject(SubjectBase):
     id: int
     created_at: datetime
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, defer_build=True, frozen=True)
 
 class Room(RoomBase):
     id: int
     created_at: datetime
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, defer_build=True, frozen=True)
 
 class ClassGroup(ClassGroupBase):
     id: int
     created_at: datetime
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, defer_build=True, frozen=True)
 
 class TimeSlot(TimeSlotBase):
     id: int
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, defer_build=True, frozen=True)
 
 class TimetableEntry(BaseModel):
     id: int
@@ -149,7 +152,28 @@ class TimetableEntry(BaseModel):
     class_group: Optional[ClassGroup] = None
     teacher: Optional[Teacher] = None
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, defer_build=True, frozen=True)
+
+class TimetableEntryFlat(BaseModel):
+    """Flat per-entry payload for bulk reads: FK ids plus precomposed display
+    strings, so no 5-way nested model serialization happens per row."""
+    id: int
+    version_id: Optional[int] = None
+    time_slot_id: Optional[int] = None
+    subject_id: Optional[int] = None
+    room_id: Optional[int] = None
+    class_group_id: Optional[int] = None
+    teacher_id: Optional[int] = None
+
+    subject_name: Optional[str] = None
+    room_name: Optional[str] = None
+    teacher_name: Optional[str] = None
+    class_group_name: Optional[str] = None
+    day: Optional[str] = None
+    period: Optional[int] = None
+    time_slot_label: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True, defer_build=True, frozen=True)
 
 class TimetableVersionShort(BaseModel):
     id: int
@@ -160,12 +184,12 @@ class TimetableVersionShort(BaseModel):
     fitness_score: Optional[int]
     created_at: datetime
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, defer_build=True, frozen=True)
 
 class TimetableVersion(TimetableVersionShort):
     entries: List[TimetableEntry] = []
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, defer_build=True, frozen=True)
 
 # --- Analytics Schemas ---
 
@@ -185,20 +209,20 @@ class AnalyticsReport(BaseModel):
 # Substitution Schemas
 class MarkAbsentRequest(BaseModel):
     teacher_id: int
-    date: str  # Format: YYYY-MM-DD
-    reason: Optional[str] = "Not specified"
+    date: str = Field(pattern=DATE_PATTERN)  # Format: YYYY-MM-DD
+    reason: Optional[str] = Field(default="Not specified")
 
 class AssignSubstituteRequest(BaseModel):
     timetable_entry_id: int
-    date: str
+    date: str = Field(pattern=DATE_PATTERN)
     substitute_teacher_id: int
     original_teacher_id: int
 
 class CancelClassRequest(BaseModel):
     timetable_entry_id: int
-    date: str
+    date: str = Field(pattern=DATE_PATTERN)
     original_teacher_id: int
-    reason: Optional[str] = "No substitute available"
+    reason: Optional[str] = Field(default="No substitute available")
 
 class AffectedClass(BaseModel):
     entry_id: int
@@ -231,7 +255,7 @@ class SubstitutionResponse(BaseModel):
     status: str
 
 class SubstitutionCreate(BaseModel):
-    date: str
+    date: str = Field(pattern=DATE_PATTERN)
     timetable_entry_id: int
     original_teacher_id: int
     substitute_teacher_id: Optional[int] = None
@@ -257,7 +281,7 @@ class Lesson(BaseModel):
     class_groups: List[ClassGroup]
     subjects: List[Subject]
     created_at: datetime
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, defer_build=True, frozen=True)
 
 class BulkImportRequest(BaseModel):
     text: str
@@ -283,7 +307,7 @@ class TeacherWorkloadAspectCreate(TeacherWorkloadAspectBase):
 class TeacherWorkloadAspect(TeacherWorkloadAspectBase):
     id: int
     created_at: datetime
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, defer_build=True, frozen=True)
 
 class WorkloadOverrideCreate(BaseModel):
     version_id: Optional[int] = 0
@@ -292,5 +316,5 @@ class WorkloadOverrideCreate(BaseModel):
 class WorkloadOverride(WorkloadOverrideCreate):
     id: int
     created_at: datetime
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, defer_build=True, frozen=True)
 
@@ -0,0 +1,51 @@
+"""
+One-shot schema bootstrap.
+
+Run `python -m app.bootstrap` once before starting uvicorn workers so the
+server processes don't each re-inspect the schema at import time
+(see main.py / AUTO_CREATE_SCHEMA).
+"""
+from sqlalchemy import inspect, text
+
+from .infrastructure import models
+from .infrastructure.database import engine
+
+
+def ensure_schema(engine):
+    """Create missing tables and add columns missing from existing ones.
+
+    create_all only creates whole tables, so a database created before a
+    model gained a column (e.g. timetable_versions.updated_at) would 500
+    on every query against that table. SQLite can't ADD COLUMN with a
+    non-constant default, so the column is added bare and any server
+    default is backfilled with an UPDATE afterwards.
+    """
+    models.Base.metadata.create_all(bind=engine)
+
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in models.Base.metadata.sorted_tables:
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                col_type = column.type.compile(engine.dialect)
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}"))
+                if column.server_default is not None:
+                    default = column.server_default.arg
+                    if not isinstance(default, str):
+                        default = default.compile(dialect=engine.dialect)
+                    conn.execute(text(
+                        f"UPDATE {table.name} SET {column.name} = {default} "
+                        f"WHERE {column.name} IS NULL"))
+                print(f"Added missing column {table.name}.{column.name}")
+
+
+def main():
+    ensure_schema(engine)
+    print("Database schema created/verified")
+
+
+if __name__ == "__main__":
+    main()
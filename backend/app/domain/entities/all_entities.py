@@ -43,3 +43,15 @@ class TimeSlot:
     start_time: str
     end_time: str
     is_break: bool = False
+
+@dataclass(slots=True)
+class RequiredAssignment:
+    """One lesson occurrence the solver must place. slots=True keeps the
+    record at fixed-field size instead of a per-entry dict; the solver
+    traverses thousands of these in its inner loops."""
+    assignment_id: int
+    group_id: int
+    subject_id: int
+    teacher_id: int
+    duration: int = 1
+    occurrence: int = 1
@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, JSON, DateTime, Table
+from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, JSON, DateTime, Table, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -106,6 +106,7 @@ class TimetableVersion(Base):
     is_valid = Column(Boolean, default=True)
     fitness_score = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     entries = relationship("TimetableEntry", back_populates="version", cascade="all, delete-orphan")
 
@@ -127,6 +128,11 @@ class TimetableEntry(Base):
     class_group = relationship("ClassGroup")
     teacher = relationship("Teacher")
 
+    # Covers the substitution-path availability/conflict lookups
+    __table_args__ = (
+        Index("ix_tte_vid_tid_tsid", "version_id", "teacher_id", "time_slot_id"),
+    )
+
 class Holiday(Base):
     __tablename__ = "holidays"
 
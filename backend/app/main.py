@@ -1,62 +1,124 @@
 # FastAPI Entry Point
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
-from fastapi.middleware.cors import CORSMiddleware
+import hashlib
+import pathlib
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from fastapi.responses import FileResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
+from sqlalchemy.orm import Session
 import os
 from .infrastructure import models
-from .infrastructure.database import engine, SessionLocal
+from .infrastructure.database import engine, get_db, SessionLocal
+from .api.middleware import FastCORS
 from .api.routers import timetables, teachers, subjects, rooms, solvers, operational, analytics, substitutions, imports
 
-# Auto-create tables on startup
-models.Base.metadata.create_all(bind=engine)
+# Schema creation is opt-in: create_all re-inspects every table on each
+# process start, which multi-worker uvicorn pays N times in parallel. Run
+# `python -m app.bootstrap` once instead, or set AUTO_CREATE_SCHEMA=1.
+if os.getenv("AUTO_CREATE_SCHEMA") == "1":
+    from .bootstrap import ensure_schema
+    ensure_schema(engine)
 
 app = FastAPI(
     title="TimeTable Generator API",
     description="Automated timetable generation with intelligent teacher substitution",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse  # orjson C encoder (handles datetime natively)
 )
 
-origins = [
-    "http://localhost:5173",
-    "http://localhost:3000",
-    "http://localhost:8080",
-    "http://127.0.0.1:8000",
-    "http://127.0.0.1:5173",
-    "null",  # Allow local file access
-    "*"  # Allow all for development
-]
-
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+# Wildcard CORS for development (covers localhost dev servers and local
+# file access); headers are precomputed once inside FastCORS.
+app.add_middleware(FastCORS)
+
+# Deterministic seed data, materialized once at import time
+_DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday")
+TIME_SLOT_ROWS = tuple(
+    {"day": day, "period": i, "start_time": f"{8+i}:00",
+     "end_time": f"{9+i}:00", "is_break": (i == 4)}
+    for day in _DAYS
+    for i in range(1, 9)  # 8 periods, lunch break at period 4
 )
 
 # Startup event - auto-seed if database is empty
-# DISABLED TEMPORARILY FOR DEBUGGING
-# @app.on_event("startup")
-# async def startup_event():
-#     """Auto-initialize database with sample data if empty"""
-#     db = SessionLocal()
-#     try:
-#         # Check if database has any data
-#         teacher_count = db.query(models.Teacher).count()
-#         
-#         if teacher_count == 0:
-#             print("Database is empty. Auto-seeding with sample data...")
-#             # ... rest of startup code ...
-#         else:
-#             print(f"Database already initialized ({teacher_count} teachers)")
-#     
-#     except Exception as e:
-#         print(f"WARNING: Auto-seeding failed: {e}")
-#         db.rollback()
-#     finally:
-#         db.close()
+@app.on_event("startup")
+async def startup_event():
+    """Auto-initialize database with sample data if empty"""
+    db = SessionLocal()
+    try:
+        # Check if database has any data (LIMIT 1 probe, not COUNT(*))
+        is_empty = db.query(models.Teacher.id).limit(1).first() is None
+
+        if is_empty:
+            print("Database is empty. Auto-seeding with sample data...")
+            # Plain row dicts + bulk_insert_mappings: one executemany per
+            # table, no per-row ORM flush, single commit for the whole seed
+            db.bulk_insert_mappings(models.TimeSlot, TIME_SLOT_ROWS)
+
+            db.bulk_insert_mappings(models.Teacher, [
+                {"id": 1, "name": "Dr. Rajesh Kumar", "email": "rajesh.kumar@college.edu", "max_hours_per_week": 18},
+                {"id": 2, "name": "Prof. Priya Sharma", "email": "priya.sharma@college.edu", "max_hours_per_week": 16},
+                {"id": 3, "name": "Dr. Amit Patel", "email": "amit.patel@college.edu", "max_hours_per_week": 15},
+                {"id": 4, "name": "Dr. Sneha Desai", "email": "sneha.desai@college.edu", "max_hours_per_week": 14},
+                {"id": 5, "name": "Prof. Vikram Singh", "email": "vikram.singh@college.edu", "max_hours_per_week": 16},
+            ])
+
+            db.bulk_insert_mappings(models.Room, [
+                {"name": "Room 101", "capacity": 60, "type": "LectureHall", "resources": ["Projector", "Whiteboard"]},
+                {"name": "Room 102", "capacity": 60, "type": "LectureHall", "resources": ["Projector", "Whiteboard"]},
+                {"name": "Lab 401", "capacity": 40, "type": "ComputerLab", "resources": ["Computers", "Projector"]},
+                {"name": "Lab 402", "capacity": 40, "type": "ComputerLab", "resources": ["Computers", "Projector"]},
+                {"name": "Conference Hall", "capacity": 100, "type": "Auditorium", "resources": ["Projector", "Sound System"]},
+            ])
+
+            db.bulk_insert_mappings(models.ClassGroup, [
+                {"name": "SE-AI-DS-A", "student_count": 60},
+                {"name": "SE-AI-DS-B", "student_count": 55},
+                {"name": "TE-AI-DS-A", "student_count": 50},
+            ])
+
+            db.bulk_insert_mappings(models.Subject, [
+                {"name": "Data Structures", "code": "CS301", "is_lab": False, "credits": 4,
+                 "required_room_type": "LectureHall", "duration_slots": 1, "teacher_id": 1},
+                {"name": "Database Management", "code": "CS302", "is_lab": False, "credits": 3,
+                 "required_room_type": "LectureHall", "duration_slots": 1, "teacher_id": 2},
+                {"name": "Database Lab", "code": "CS302L", "is_lab": True, "credits": 2,
+                 "required_room_type": "ComputerLab", "duration_slots": 2, "teacher_id": 2},
+                {"name": "Machine Learning", "code": "CS401", "is_lab": False, "credits": 4,
+                 "required_room_type": "LectureHall", "duration_slots": 1, "teacher_id": 3},
+                {"name": "ML Lab", "code": "CS401L", "is_lab": True, "credits": 2,
+                 "required_room_type": "ComputerLab", "duration_slots": 2, "teacher_id": 3},
+                {"name": "Web Development", "code": "CS303", "is_lab": False, "credits": 3,
+                 "required_room_type": "LectureHall", "duration_slots": 1, "teacher_id": 4},
+                {"name": "Software Engineering", "code": "SE201", "is_lab": False, "credits": 4,
+                 "required_room_type": "LectureHall", "duration_slots": 1, "teacher_id": 5},
+                {"name": "SE Project Lab", "code": "SE201L", "is_lab": True, "credits": 3,
+                 "required_room_type": "ComputerLab", "duration_slots": 2, "teacher_id": 5},
+            ])
+
+            db.commit()
+            print(f"Auto-seeded {len(TIME_SLOT_ROWS)} time slots plus teachers, rooms, groups and subjects")
+        else:
+            print("Database already initialized")
+
+    except Exception as e:
+        print(f"WARNING: Auto-seeding failed: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+@app.on_event("startup")
+async def warm_pool():
+    """Open pool_size connections up front so the first requests don't pay
+    connect latency; the engine is sync, so fan out over threads."""
+    import asyncio
+    from sqlalchemy import text
+
+    def ping():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(
+        asyncio.to_thread(ping) for _ in range(engine.pool.size())
+    ))
 
 app.include_router(timetables.router, prefix="/api/timetables", tags=["timetables"])
 app.include_router(teachers.router, prefix="/api/teachers", tags=["teachers"])
@@ -76,64 +138,114 @@ app.include_router(lessons.router, prefix="/api/lessons", tags=["lessons"])
 from .api.routers import classgroups
 app.include_router(classgroups.router, prefix="/api/class-groups", tags=["class-groups"])
 
+# Tiny TTL memo for /health: liveness probes can hit this every couple of
+# seconds, and each uncached call costs two COUNT(*) queries
+_HEALTH_CACHE_TTL = 2.0
+_health_cache = {"expires_at": 0.0, "payload": None}
+
 @app.get("/health")
-def health_check():
+def health_check(db: Session = Depends(get_db)):
     """Health check endpoint for monitoring"""
-    db = SessionLocal()
+    import time
+    now = time.monotonic()
+    if _health_cache["payload"] is not None and now < _health_cache["expires_at"]:
+        return _health_cache["payload"]
+
     try:
-        # Check database connectivity
-        teacher_count = db.query(models.Teacher).count()
-        timetable_count = db.query(models.TimetableVersion).count()
+        # Check database connectivity with O(1) LIMIT 1 probes; exact
+        # counts live on /stats so the probe path never scans
+        has_teachers = db.query(models.Teacher.id).limit(1).first() is not None
+        has_timetables = db.query(models.TimetableVersion.id).limit(1).first() is not None
 
         from datetime import datetime
-        return {
+        payload = {
             "status": "healthy",
             "database": "connected",
-            "teachers": teacher_count,
-            "timetables": timetable_count,
+            "has_data": has_teachers,
+            "has_timetables": has_timetables,
             "timestamp": datetime.now().isoformat()
         }
+        _health_cache["payload"] = payload
+        _health_cache["expires_at"] = now + _HEALTH_CACHE_TTL
+        return payload
     except Exception as e:
         return {
             "status": "unhealthy",
             "error": str(e)
         }
-    finally:
-        db.close()
+
+@app.get("/stats")
+def stats(db: Session = Depends(get_db)):
+    """Exact table counts, kept off the hot /health path"""
+    return {
+        "teachers": db.query(models.Teacher).count(),
+        "timetables": db.query(models.TimetableVersion).count(),
+    }
+# Resolve and preload the timetable page once at import time so serving it
+# costs no stat/read syscalls per request
+_PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[2]
+_TIMETABLE_HTML = _PROJECT_ROOT / "timetable_page.html"
+if _TIMETABLE_HTML.exists():
+    _TIMETABLE_BYTES = _TIMETABLE_HTML.read_bytes()
+    _TIMETABLE_ETAG = f'"{hashlib.md5(_TIMETABLE_BYTES).hexdigest()}"'
+else:
+    _TIMETABLE_BYTES = None
+    _TIMETABLE_ETAG = None
+
+def _serve_timetable_page(request: Request) -> Response:
+    if request.headers.get("if-none-match") == _TIMETABLE_ETAG:
+        return Response(status_code=304)
+    return Response(
+        content=_TIMETABLE_BYTES,
+        media_type="text/html",
+        headers={"ETag": _TIMETABLE_ETAG, "Cache-Control": "public, max-age=60"},
+    )
+
 @app.get("/timetable_page.html")
-async def get_timetable_page():
+async def get_timetable_page(request: Request):
     """Serve timetable_page.html"""
-    import pathlib
-    root = pathlib.Path(__file__).parent.parent.parent
-    filepath = root / "timetable_page.html"
-    if filepath.exists():
-        return FileResponse(str(filepath), media_type="text/html")
-    else:
-        raise HTTPException(status_code=404, detail=f"File not found: {filepath}")
+    if _TIMETABLE_BYTES is None:
+        raise HTTPException(status_code=404, detail=f"File not found: {_TIMETABLE_HTML}")
+    return _serve_timetable_page(request)
 
 
 @app.get("/")
-async def root_index():
+async def root_index(request: Request):
     """Serve the default timetable page at root for convenience"""
-    import pathlib
-    root = pathlib.Path(__file__).parent.parent.parent
-    filepath = root / "timetable_page.html"
-    if filepath.exists():
-        return FileResponse(str(filepath), media_type="text/html")
+    if _TIMETABLE_BYTES is not None:
+        return _serve_timetable_page(request)
     # fallback: try frontend/index.html
-    filepath2 = root / "frontend" / "index.html"
-    if filepath2.exists():
-        return FileResponse(str(filepath2), media_type="text/html")
+    fallback = _PROJECT_ROOT / "frontend" / "index.html"
+    if fallback.exists():
+        return FileResponse(str(fallback), media_type="text/html",
+                            headers={"Cache-Control": "public, max-age=60"})
     raise HTTPException(status_code=404, detail="No default page found in project root")
 
 # Mount static files (frontend HTML, CSS, JS) - MUST BE LAST
 # Serve the repository root so pages like timetable_page.html and
 # associated JS/CSS are available at the root paths the HTML expects.
+# The legacy pages live directly in the project root next to backend
+# source and the SQLite file, so the mount is restricted to known asset
+# types: everything else 404s without touching the filesystem.
+_STATIC_ALLOWED_SUFFIXES = {
+    ".html", ".htm", ".js", ".css", ".json", ".png", ".jpg", ".jpeg",
+    ".gif", ".svg", ".ico", ".csv", ".woff", ".woff2", ".map",
+}
+
+class FilteredStaticFiles(StaticFiles):
+    """StaticFiles limited to frontend asset extensions."""
+
+    async def get_response(self, path, scope):
+        suffix = os.path.splitext(path)[1].lower()
+        if suffix and suffix not in _STATIC_ALLOWED_SUFFIXES:
+            raise HTTPException(status_code=404)
+        return await super().get_response(path, scope)
+
 try:
     backend_dir = os.path.dirname(os.path.dirname(__file__))  # backend/app -> backend/
     static_dir = os.path.dirname(backend_dir)  # TimeTable-Generator/ (project root)
     if os.path.isdir(static_dir):
-        app.mount("/", StaticFiles(directory=static_dir, html=True), name="static")
+        app.mount("/", FilteredStaticFiles(directory=static_dir, html=True), name="static")
     else:
         print(f"Warning: Static directory not found at {static_dir}")
 except Exception as e:
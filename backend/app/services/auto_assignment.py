@@ -3,13 +3,23 @@ Intelligent Auto-Assignment Service for Teacher Substitution
 Automatically finds and assigns the best substitute teacher based on multiple criteria.
 """
 
+import re
+from functools import cached_property
 from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import and_, exists, func
 from sqlalchemy.orm import Session
 from datetime import datetime
 
 from app.infrastructure import models
 
 
+# Substitution rows are written in transactions of this size; keeps the
+# statement and redo set bounded for teachers with very many classes
+INSERT_BATCH_SIZE = 1000
+
+
 class SubstituteScorer:
     """Calculate scores for potential substitute teachers"""
     
@@ -33,136 +43,197 @@ class SubstituteScorer:
         max_hours_threshold: int = 18
     ) -> Dict:
         """
-        Calculate a score for a potential substitute teacher.
-        
+        Calculate a score for a single potential substitute teacher.
+
         Returns:
             Dict with score, breakdown, and availability info
         """
-        candidate = self.db.query(models.Teacher).filter(
-            models.Teacher.id == candidate_id
-        ).first()
-        
-        if not candidate:
-            return {"score": 0, "available": False, "reason": "Teacher not found"}
-        
-        # Check availability for all required time slots
-        is_available, conflicting_slots = self._check_availability(
-            candidate_id, required_time_slots
-        )
-        
-        if not is_available:
-            return {
+        return self.score_batch(
+            [candidate_id], required_time_slots, required_subjects, max_hours_threshold
+        )[0]
+
+    def score_batch(
+        self,
+        candidate_ids: List[int],
+        required_time_slots: List[int],
+        required_subjects: List[str],
+        max_hours_threshold: int = 18
+    ) -> List[Dict]:
+        """
+        Score many candidates with a fixed number of queries instead of
+        ~4 queries per candidate: one bulk Teacher fetch, one conflict
+        lookup, one GROUP BY workload count and one subject fetch. The
+        per-candidate loop is then pure dict arithmetic.
+
+        Returns:
+            List of score dicts, in the same order as candidate_ids
+        """
+        if not candidate_ids:
+            return []
+
+        candidates = {t.id: t for t in self.db.query(models.Teacher).filter(
+            models.Teacher.id.in_(candidate_ids)
+        ).all()}
+
+        # (a) Which candidates are busy during the required slots, and when
+        conflict_rows = self.db.query(
+            models.TimetableEntry.teacher_id, models.TimetableEntry.time_slot_id
+        ).filter(
+            models.TimetableEntry.version_id == self.version_id,
+            models.TimetableEntry.teacher_id.in_(candidate_ids),
+            models.TimetableEntry.time_slot_id.in_(required_time_slots)
+        ).all()
+        conflicts_by_teacher: Dict[int, List[int]] = {}
+        for teacher_id, slot_id in conflict_rows:
+            conflicts_by_teacher.setdefault(teacher_id, []).append(slot_id)
+
+        # (b) Current class count per candidate
+        workload_by_teacher = dict(self.db.query(
+            models.TimetableEntry.teacher_id, func.count(models.TimetableEntry.id)
+        ).filter(
+            models.TimetableEntry.version_id == self.version_id,
+            models.TimetableEntry.teacher_id.in_(candidate_ids)
+        ).group_by(models.TimetableEntry.teacher_id).all())
+
+        # (c) Subjects taught per candidate
+        subjects_by_teacher: Dict[int, set] = {}
+        for teacher_id, subject_name in self.db.query(
+            models.Subject.teacher_id, models.Subject.name
+        ).filter(models.Subject.teacher_id.in_(candidate_ids)).all():
+            subjects_by_teacher.setdefault(teacher_id, set()).add(subject_name.lower())
+
+        required_subject_names = {s.lower() for s in required_subjects}
+
+        # Partial-match machinery built once per batch, not per candidate:
+        # the alternation finds a required name inside a teacher's subject,
+        # the joined blob finds a teacher's subject inside a required name
+        required_pattern = re.compile(
+            "|".join(map(re.escape, sorted(required_subject_names)))
+        ) if required_subject_names else None
+        required_blob = "\n".join(required_subject_names)
+
+        # Vectorize the per-candidate arithmetic over the available set:
+        # total = availability + expertise + workload_weight * (1 - load/max)
+        available_ids = [
+            cid for cid in candidate_ids
+            if cid in candidates and cid not in conflicts_by_teacher
+        ]
+        n = len(available_ids)
+        subject_scores = np.fromiter((
+            self._expertise_score(
+                subjects_by_teacher.get(cid, set()), required_subject_names,
+                required_pattern, required_blob
+            )
+            for cid in available_ids
+        ), dtype=np.float64, count=n)
+        current_workloads = np.fromiter(
+            (workload_by_teacher.get(cid, 0) for cid in available_ids),
+            dtype=np.float64, count=n)
+        max_hours = np.fromiter(
+            (candidates[cid].max_hours_per_week or max_hours_threshold
+             for cid in available_ids),
+            dtype=np.float64, count=n)
+
+        availability_score = self.WEIGHTS["availability"]  # Full points if available
+        workload_scores = self.WEIGHTS["workload_balance"] * np.maximum(
+            0.0, 1.0 - current_workloads / max_hours)
+        total_scores = availability_score + subject_scores + workload_scores
+        index_of = {cid: i for i, cid in enumerate(available_ids)}
+
+        results = []
+        for candidate_id in candidate_ids:
+            candidate = candidates.get(candidate_id)
+            if not candidate:
+                results.append({"score": 0, "available": False, "reason": "Teacher not found"})
+                continue
+
+            conflicting_slots = conflicts_by_teacher.get(candidate_id)
+            if conflicting_slots:
+                results.append({
+                    "teacher_id": candidate_id,
+                    "teacher_name": candidate.name,
+                    "score": 0,
+                    "available": False,
+                    "reason": f"Busy in {len(conflicting_slots)} slots",
+                    "conflicting_slots": conflicting_slots
+                })
+                continue
+
+            i = index_of[candidate_id]
+            subject_score = subject_scores[i]
+            results.append({
                 "teacher_id": candidate_id,
                 "teacher_name": candidate.name,
-                "score": 0,
-                "available": False,
-                "reason": f"Busy in {len(conflicting_slots)} slots",
-                "conflicting_slots": conflicting_slots
-            }
-        
-        # Calculate individual scores
-        availability_score = self.WEIGHTS["availability"]  # Full points if available
-        
-        subject_score = self._calculate_subject_expertise_score(
-            candidate_id, required_subjects
-        )
-        
-        workload_score = self._calculate_workload_score(
-            candidate_id, max_hours_threshold
-        )
-        
-        # Total score
-        total_score = availability_score + subject_score + workload_score
-        
-        # Get current workload info
-        current_workload = self._get_teacher_workload(candidate_id)
-        
-        return {
-            "teacher_id": candidate_id,
-            "teacher_name": candidate.name,
-            "score": total_score,
-            "available": True,
-            "breakdown": {
-                "availability": availability_score,
-                "subject_expertise": subject_score,
-                "workload_balance": workload_score,
-            },
-            "current_workload": current_workload,
-            "max_hours": candidate.max_hours_per_week,
-            "teaches_same_subject": subject_score > 0
-        }
+                "score": float(total_scores[i]),
+                "available": True,
+                "breakdown": {
+                    "availability": availability_score,
+                    "subject_expertise": float(subject_score),
+                    "workload_balance": float(workload_scores[i]),
+                },
+                "current_workload": int(current_workloads[i]),
+                "max_hours": candidate.max_hours_per_week,
+                "teaches_same_subject": bool(subject_score > 0)
+            })
+
+        return results
     
     def _check_availability(
-        self, 
-        teacher_id: int, 
-        time_slot_ids: List[int]
+        self,
+        teacher_id: int,
+        time_slot_ids: List[int],
+        return_conflicts: bool = False
     ) -> Tuple[bool, List[int]]:
-        """Check if teacher is free during all required time slots"""
-        conflicting = self.db.query(models.TimetableEntry.time_slot_id).filter(
+        """Check if teacher is free during all required time slots.
+
+        By default uses an EXISTS probe that stops at the first conflicting
+        row; pass return_conflicts=True to also get the conflicting slot ids.
+        """
+        conflict_filter = and_(
             models.TimetableEntry.version_id == self.version_id,
             models.TimetableEntry.teacher_id == teacher_id,
             models.TimetableEntry.time_slot_id.in_(time_slot_ids)
-        ).all()
-        
+        )
+
+        if not return_conflicts:
+            has_conflict = self.db.query(exists().where(conflict_filter)).scalar()
+            return not has_conflict, []
+
+        conflicting = self.db.query(
+            models.TimetableEntry.time_slot_id
+        ).filter(conflict_filter).all()
+
         conflicting_slots = [slot[0] for slot in conflicting]
         is_available = len(conflicting_slots) == 0
-        
+
         return is_available, conflicting_slots
     
-    def _calculate_subject_expertise_score(
-        self, 
-        teacher_id: int, 
-        required_subjects: List[str]
+    def _expertise_score(
+        self,
+        teacher_subject_names: set,
+        required_subject_names: set,
+        required_pattern: Optional[re.Pattern],
+        required_blob: str
     ) -> float:
-        """Calculate score based on subject expertise match"""
-        teacher_subjects = self.db.query(models.Subject).filter(
-            models.Subject.teacher_id == teacher_id
-        ).all()
-        
-        teacher_subject_names = {s.name.lower() for s in teacher_subjects}
-        required_subject_names = {s.lower() for s in required_subjects}
-        
-        # Check for exact or partial matches
+        """Calculate score based on subject expertise match (names pre-lowercased)"""
+        # Check for exact matches first
         exact_matches = teacher_subject_names & required_subject_names
-        
+
         if exact_matches:
             # Full expertise score if they teach the exact subject
             return self.WEIGHTS["subject_expertise"]
-        
-        # Partial credit for related subjects (e.g., "ML Lab" and "Machine Learning")
-        for ts in teacher_subject_names:
-            for rs in required_subject_names:
-                if ts in rs or rs in ts:
-                    return self.WEIGHTS["subject_expertise"] * 0.7
-        
+
+        # Partial credit for related subjects (e.g., "Database" and
+        # "Database Lab"): one linear pass over the teacher's subjects
+        # against the prebuilt alternation/blob instead of a nested loop
+        if required_pattern and any(
+            required_pattern.search(ts) or ts in required_blob
+            for ts in teacher_subject_names
+        ):
+            return self.WEIGHTS["subject_expertise"] * 0.7
+
         return 0
-    
-    def _calculate_workload_score(
-        self, 
-        teacher_id: int, 
-        max_hours_threshold: int
-    ) -> float:
-        """Calculate score based on current workload (prefer less busy teachers)"""
-        teacher = self.db.query(models.Teacher).filter(
-            models.Teacher.id == teacher_id
-        ).first()
-        
-        current_classes = self.db.query(models.TimetableEntry).filter(
-            models.TimetableEntry.version_id == self.version_id,
-            models.TimetableEntry.teacher_id == teacher_id
-        ).count()
-        
-        # Calculate utilization percentage
-        max_hours = teacher.max_hours_per_week if teacher else max_hours_threshold
-        utilization = (current_classes / max_hours) * 100
-        
-        # Score inversely proportional to workload
-        # Teacher at 0% utilization gets full score
-        # Teacher at 100% utilization gets 0 score
-        workload_score = self.WEIGHTS["workload_balance"] * (1 - (utilization / 100))
-        
-        return max(0, workload_score)
-    
+
     def _get_teacher_workload(self, teacher_id: int) -> int:
         """Get current number of classes for teacher"""
         return self.db.query(models.TimetableEntry).filter(
@@ -176,17 +247,42 @@ class AutoAssignmentService:
     
     def __init__(self, db: Session):
         self.db = db
-        self.latest_version = self._get_latest_version()
-        if self.latest_version:
-            self.scorer = SubstituteScorer(db, self.latest_version.id)
-        else:
-            self.scorer = None
-    
-    def _get_latest_version(self) -> Optional[models.TimetableVersion]:
-        """Get the latest active timetable version"""
+
+    @cached_property
+    def latest_version(self) -> Optional[models.TimetableVersion]:
+        """Latest timetable version, fetched lazily on first use"""
         return self.db.query(models.TimetableVersion).order_by(
             models.TimetableVersion.created_at.desc()
         ).first()
+
+    @cached_property
+    def scorer(self) -> Optional[SubstituteScorer]:
+        if self.latest_version:
+            return SubstituteScorer(self.db, self.latest_version.id)
+        return None
+
+    def _insert_substitutions(
+        self,
+        entries: List[models.TimetableEntry],
+        date: str,
+        teacher_id: int,
+        substitute_teacher_id: Optional[int],
+        status: str
+    ) -> None:
+        """Write substitution rows in multi-valued INSERTs of bounded size"""
+        for start in range(0, len(entries), INSERT_BATCH_SIZE):
+            chunk = entries[start:start + INSERT_BATCH_SIZE]
+            self.db.execute(models.Substitution.__table__.insert().values([
+                {
+                    "date": date,
+                    "timetable_entry_id": entry.id,
+                    "original_teacher_id": teacher_id,
+                    "substitute_teacher_id": substitute_teacher_id,
+                    "status": status
+                }
+                for entry in chunk
+            ]))
+            self.db.flush()
     
     def auto_assign_substitutes(
         self,
@@ -241,29 +337,44 @@ class AutoAssignmentService:
         # Collect required time slots and subjects
         time_slot_ids = [entry.time_slot_id for entry in entries]
         subject_ids = list(set([entry.subject_id for entry in entries]))
-        
+
         subjects = self.db.query(models.Subject).filter(
             models.Subject.id.in_(subject_ids)
         ).all()
         required_subjects = [s.name for s in subjects]
+
+        # Bulk-fetch the related entities once, so the per-entry loop below
+        # is pure dict lookups instead of 4 queries per entry
+        subject_map = {s.id: s for s in subjects}
+        time_slot_map = {t.id: t for t in self.db.query(models.TimeSlot).filter(
+            models.TimeSlot.id.in_(set(time_slot_ids))
+        ).all()}
+        class_group_map = {g.id: g for g in self.db.query(models.ClassGroup).filter(
+            models.ClassGroup.id.in_({e.class_group_id for e in entries})
+        ).all()}
+        room_map = {r.id: r for r in self.db.query(models.Room).filter(
+            models.Room.id.in_({e.room_id for e in entries})
+        ).all()}
         
         # Get all potential substitutes (all teachers except the absent one)
-        all_teachers = self.db.query(models.Teacher).filter(
+        candidate_ids = [row[0] for row in self.db.query(models.Teacher.id).filter(
             models.Teacher.id != teacher_id
-        ).all()
-        
-        # Score all candidates
-        scored_candidates = []
-        for candidate in all_teachers:
-            score_result = self.scorer.score_substitute(
-                candidate.id,
-                time_slot_ids,
-                required_subjects,
-                max_hours_threshold=18
-            )
-            if score_result.get("available", False):
-                scored_candidates.append(score_result)
-        
+        ).all()]
+
+        # Score all candidates in one batched pass; scoring only reads, so
+        # skip the session's pre-query flush checks
+        with self.db.no_autoflush:
+            scored_candidates = [
+                score_result
+                for score_result in self.scorer.score_batch(
+                    candidate_ids,
+                    time_slot_ids,
+                    required_subjects,
+                    max_hours_threshold=18
+                )
+                if score_result.get("available", False)
+            ]
+
         # Sort by score (highest first)
         scored_candidates.sort(key=lambda x: x["score"], reverse=True)
         
@@ -272,31 +383,21 @@ class AutoAssignmentService:
         
         if scored_candidates:
             best_substitute = scored_candidates[0]
-            
+
+            # Multi-valued INSERTs in sized batches: one statement per
+            # 1000 rows, flushed as we go, one commit at the end
+            self._insert_substitutions(
+                entries, date, teacher_id,
+                substitute_teacher_id=best_substitute["teacher_id"],
+                status="confirmed"  # Auto-confirmed for now
+            )
+
             for entry in entries:
-                # Create substitution record
-                substitution = models.Substitution(
-                    date=date,
-                    timetable_entry_id=entry.id,
-                    original_teacher_id=teacher_id,
-                    substitute_teacher_id=best_substitute["teacher_id"],
-                    status="confirmed"  # Auto-confirmed for now
-                )
-                self.db.add(substitution)
-                
-                # Get class details
-                subject = self.db.query(models.Subject).filter(
-                    models.Subject.id == entry.subject_id
-                ).first()
-                time_slot = self.db.query(models.TimeSlot).filter(
-                    models.TimeSlot.id == entry.time_slot_id
-                ).first()
-                class_group = self.db.query(models.ClassGroup).filter(
-                    models.ClassGroup.id == entry.class_group_id
-                ).first()
-                room = self.db.query(models.Room).filter(
-                    models.Room.id == entry.room_id
-                ).first()
+                # Get class details (prefetched above)
+                subject = subject_map.get(entry.subject_id)
+                time_slot = time_slot_map.get(entry.time_slot_id)
+                class_group = class_group_map.get(entry.class_group_id)
+                room = room_map.get(entry.room_id)
                 
                 assignments.append({
                     "subject": subject.name if subject else "Unknown",
@@ -324,16 +425,12 @@ class AutoAssignmentService:
             }
         else:
             # No available substitute found - mark classes as cancelled
-            for entry in entries:
-                substitution = models.Substitution(
-                    date=date,
-                    timetable_entry_id=entry.id,
-                    original_teacher_id=teacher_id,
-                    substitute_teacher_id=None,
-                    status="cancelled"
-                )
-                self.db.add(substitution)
-            
+            self._insert_substitutions(
+                entries, date, teacher_id,
+                substitute_teacher_id=None,
+                status="cancelled"
+            )
+
             self.db.commit()
             
             return {
@@ -381,20 +478,18 @@ class AutoAssignmentService:
         time_slot_ids = [entry.time_slot_id]
         
         # Get all teachers except the current one
-        all_teachers = self.db.query(models.Teacher).filter(
+        candidate_ids = [row[0] for row in self.db.query(models.Teacher.id).filter(
             models.Teacher.id != entry.teacher_id
-        ).all()
-        
-        # Score all candidates
-        scored_candidates = []
-        for candidate in all_teachers:
-            score_result = self.scorer.score_substitute(
-                candidate.id,
+        ).all()]
+
+        # Score all candidates in one batched pass (reads only, no flushes)
+        with self.db.no_autoflush:
+            scored_candidates = self.scorer.score_batch(
+                candidate_ids,
                 time_slot_ids,
                 required_subjects
             )
-            scored_candidates.append(score_result)
-        
+
         # Sort by score and return top N
         scored_candidates.sort(key=lambda x: x.get("score", 0), reverse=True)
         return scored_candidates[:top_n]
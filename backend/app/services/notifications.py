@@ -3,28 +3,88 @@ Notification Service for Teacher Substitution System
 Handles email/SMS notifications for substitute assignments
 """
 
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import itertools
+import queue
 import smtplib
+import string
+import threading
+import time
+import types
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+import aiosmtplib
+
+# Body templates parsed once at import; per-send work is just the
+# placeholder substitution
+_ASSIGNMENT_BODY_TMPL = string.Template("""
+Dear $substitute_name,
+
+You have been assigned as a substitute teacher for $absent_teacher_name on $date.
+
+Classes Assigned:
+$class_details
+
+Please confirm your availability by clicking the link below:
+[Confirmation link would go here - substitution ID: $substitution_id]
+
+Thank you for your cooperation!
+
+Best regards,
+Timetable Management System
+""")
+
+_CANCELLATION_BODY_TMPL = string.Template("""
+Dear Students,
+
+The following class has been cancelled on $date:
+
+Subject: $subject
+Time: $time_slot
+Room: $room
+
+Reason: $reason
+
+Please check for updates regarding rescheduling.
+
+Best regards,
+Timetable Management System
+""")
+
+# Shared read-only result for the common SMTP-unconfigured dev case: the
+# send methods return this before doing any templating, and every call
+# hands back the same object instead of allocating a new dict
+# SMTP reply codes worth retrying: service shutting down (421), mailbox
+# temporarily unavailable (450/451/454) and transaction failed (554)
+_TRANSIENT_SMTP_CODES = frozenset({421, 450, 451, 454, 554})
+
+_DISABLED_RESULT = types.MappingProxyType({
+    "sent": False,
+    "reason": "Email service not configured",
+    "message": "To enable notifications, configure SMTP settings in environment variables"
+})
+
 
 class NotificationService:
     """
     Service for sending notifications to substitute teachers and students.
     Currently implements email functionality (SMS can be added later).
     """
-    
+
     def __init__(
         self,
         smtp_host: str = "smtp.gmail.com",
         smtp_port: int = 587,
         sender_email: Optional[str] = None,
-        sender_password: Optional[str] = None
+        sender_password: Optional[str] = None,
+        pool_size: int = 5,
+        max_messages_per_conn: int = 100
     ):
         """
         Initialize notification service with email configuration.
-        
+
         Note: For production, these should come from environment variables.
         """
         self.smtp_host = smtp_host
@@ -32,6 +92,161 @@ class NotificationService:
         self.sender_email = sender_email
         self.sender_password = sender_password
         self.enabled = sender_email is not None and sender_password is not None
+        # Keep-alive SMTP connections reused across sends: the TLS
+        # handshake + AUTH dominates per-message cost, so N messages
+        # should cost ~N sends, not N handshakes
+        self.max_messages_per_conn = max_messages_per_conn
+        self._pool: "queue.Queue[smtplib.SMTP]" = queue.Queue(maxsize=pool_size)
+        self._sent_counts: Dict[smtplib.SMTP, int] = {}
+        # Async clients are created lazily on first use (needs a loop)
+        self.async_pool_size = 3
+        self._async_slots = None
+        self._async_cycle = None
+        # Fire-and-forget dispatch queue drained by a daemon worker, so
+        # request handlers never wait on SMTP round-trips. Bounded with a
+        # drop-oldest policy; swap for a real broker if durability matters.
+        self._queue: "queue.Queue[Tuple[str, str, str]]" = queue.Queue(maxsize=10_000)
+        self._worker_thread: Optional[threading.Thread] = None
+
+    def _ensure_worker(self) -> None:
+        if self._worker_thread is None:
+            self._worker_thread = threading.Thread(
+                target=self._worker, daemon=True, name="notification-worker"
+            )
+            self._worker_thread.start()
+
+    def _worker(self) -> None:
+        while True:
+            to_email, subject, body = self._queue.get()
+            try:
+                self._send_email(to_email, subject, body)
+            except Exception:
+                pass
+            finally:
+                self._queue.task_done()
+
+    def _enqueue(self, to_email: str, subject: str, body: str) -> None:
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((to_email, subject, body))
+        except queue.Full:
+            # Drop the oldest pending message rather than blocking a request
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._queue.put_nowait((to_email, subject, body))
+
+    def _connect(self) -> smtplib.SMTP:
+        """Open, secure and authenticate a fresh SMTP connection"""
+        server = smtplib.SMTP(self.smtp_host, self.smtp_port)
+        server.starttls()
+        server.login(self.sender_email, self.sender_password)
+        return server
+
+    def _acquire(self) -> smtplib.SMTP:
+        """Take a live connection from the pool, reconnecting if stale"""
+        try:
+            server = self._pool.get_nowait()
+        except queue.Empty:
+            return self._connect()
+        try:
+            server.noop()
+        except (smtplib.SMTPServerDisconnected, OSError):
+            self._sent_counts.pop(server, None)
+            return self._connect()
+        return server
+
+    def _release(self, server: smtplib.SMTP, msg_count: int = 0) -> None:
+        """Return a connection to the pool, recycling it once it has
+        carried max_messages_per_conn messages"""
+        total = self._sent_counts.get(server, 0) + msg_count
+        if total >= self.max_messages_per_conn or self._pool.full():
+            self._sent_counts.pop(server, None)
+            self._quit_quietly(server)
+        else:
+            self._sent_counts[server] = total
+            self._pool.put_nowait(server)
+
+    def _discard(self, server: smtplib.SMTP) -> None:
+        """Drop a connection that errored instead of pooling it"""
+        self._sent_counts.pop(server, None)
+        self._quit_quietly(server)
+
+    @staticmethod
+    def _quit_quietly(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            pass
+
+    def _next_async_slot(self) -> Tuple["aiosmtplib.SMTP", asyncio.Lock]:
+        """Round-robin over a small set of async clients; each carries its
+        own lock because aiosmtplib serializes commands per connection"""
+        if self._async_slots is None:
+            self._async_slots = [
+                (aiosmtplib.SMTP(hostname=self.smtp_host, port=self.smtp_port,
+                                 start_tls=True),
+                 asyncio.Lock())
+                for _ in range(self.async_pool_size)
+            ]
+            self._async_cycle = itertools.cycle(self._async_slots)
+        return next(self._async_cycle)
+
+    async def _send_email_async(self, to_email: str, subject: str, body: str) -> Dict:
+        """Async counterpart of _send_email; the event loop keeps serving
+        other requests during SMTP round-trips"""
+        if not self.enabled:
+            return _DISABLED_RESULT
+
+        msg = MIMEMultipart()
+        msg['From'] = self.sender_email
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        msg.attach(MIMEText(body, 'plain'))
+
+        client, lock = self._next_async_slot()
+        try:
+            async with lock:
+                if not client.is_connected:
+                    await client.connect()
+                    await client.login(self.sender_email, self.sender_password)
+                await client.send_message(msg)
+            return {
+                "sent": True,
+                "to": to_email,
+                "subject": subject,
+                "message": "Email sent successfully"
+            }
+        except Exception as e:
+            try:
+                await client.quit()
+            except Exception:
+                pass
+            return {
+                "sent": False,
+                "to": to_email,
+                "error": str(e),
+                "message": f"Failed to send email: {str(e)}"
+            }
+
+    async def send_emails_async(self, messages: List[Tuple[str, str, str]]) -> List[Dict]:
+        """Send many (to, subject, body) messages concurrently across the
+        async client pool"""
+        return list(await asyncio.gather(*(
+            self._send_email_async(to_email, subject, body)
+            for to_email, subject, body in messages
+        )))
+
+    def close_all(self) -> None:
+        """Close every pooled connection (for shutdown)"""
+        while True:
+            try:
+                server = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            self._quit_quietly(server)
+        self._sent_counts.clear()
     
     def send_substitute_assignment_email(
         self,
@@ -57,12 +272,8 @@ class NotificationService:
             Dict with success status and message
         """
         if not self.enabled:
-            return {
-                "sent": False,
-                "reason": "Email service not configured",
-                "message": "To enable notifications, configure SMTP settings in environment variables"
-            }
-        
+            return _DISABLED_RESULT
+
         subject = f"Substitute Assignment - {date}"
         
         # Build class list
@@ -71,31 +282,29 @@ class NotificationService:
             for cls in classes
         ])
         
-        # Create email body
-        body = f"""
-Dear {substitute_name},
-
-You have been assigned as a substitute teacher for {absent_teacher_name} on {date}.
-
-Classes Assigned:
-{class_details}
-
-Please confirm your availability by clicking the link below:
-[Confirmation link would go here - substitution ID: {substitution_id}]
-
-Thank you for your cooperation!
-
-Best regards,
-Timetable Management System
-"""
+        # Create email body from the precompiled template
+        body = _ASSIGNMENT_BODY_TMPL.substitute(
+            substitute_name=substitute_name,
+            absent_teacher_name=absent_teacher_name,
+            date=date,
+            class_details=class_details,
+            substitution_id=substitution_id,
+        )
         
         try:
-            return self._send_email(recipient_email, subject, body)
+            # Enqueue only: the daemon worker sends over the pooled
+            # connection, keeping SMTP latency off the request path
+            self._enqueue(recipient_email, subject, body)
+            return {
+                "sent": "queued",
+                "to": recipient_email,
+                "message": "Email queued for delivery"
+            }
         except Exception as e:
             return {
                 "sent": False,
                 "error": str(e),
-                "message": f"Failed to send email: {str(e)}"
+                "message": f"Failed to queue email: {str(e)}"
             }
     
     def send_class_cancellation_email(
@@ -118,72 +327,112 @@ Timetable Management System
             Dict with success status
         """
         if not self.enabled:
-            return {"sent": False, "reason": "Email service not configured"}
-        
-        subject = f"Class Cancelled - {date}"
-        body = f"""
-Dear Students,
-
-The following class has been cancelled on {date}:
+            return _DISABLED_RESULT
 
-Subject: {class_details.get('subject')}
-Time: {class_details.get('time_slot')}
-Room: {class_details.get('room')}
+        subject = f"Class Cancelled - {date}"
+        body = _CANCELLATION_BODY_TMPL.substitute(
+            date=date,
+            subject=class_details.get('subject'),
+            time_slot=class_details.get('time_slot'),
+            room=class_details.get('room'),
+            reason=reason,
+        )
+        
+        # The body is identical for everyone, so send one DATA with many
+        # RCPT TO commands: the server receives the message bytes once.
+        # No Bcc (or To) header: the envelope recipients below deliver to
+        # everyone, and a Bcc header in the message body would expose the
+        # full recipient list to every student.
+        msg = MIMEMultipart()
+        msg['From'] = self.sender_email
+        msg['Subject'] = subject
+        msg.attach(MIMEText(body, 'plain'))
 
-Reason: {reason}
+        try:
+            server = self._acquire()
+        except Exception as e:
+            return {"sent": False, "total": len(recipient_emails), "error": str(e)}
 
-Please check for updates regarding rescheduling.
+        refused: Dict = {}
+        try:
+            refused = server.sendmail(
+                self.sender_email, recipient_emails, msg.as_string()
+            )
+        except smtplib.SMTPRecipientsRefused as e:
+            # Every recipient was refused; nothing was delivered
+            refused = e.recipients
+        except Exception as e:
+            self._discard(server)
+            return {"sent": False, "total": len(recipient_emails), "error": str(e)}
+        self._release(server, msg_count=1)
 
-Best regards,
-Timetable Management System
-"""
-        
-        results = []
-        for email in recipient_emails:
-            try:
-                result = self._send_email(email, subject, body)
-                results.append(result)
-            except Exception as e:
-                results.append({"sent": False, "email": email, "error": str(e)})
-        
+        details = [
+            {"sent": email not in refused, "email": email,
+             **({"error": str(refused[email])} if email in refused else {})}
+            for email in recipient_emails
+        ]
         return {
-            "sent": all(r.get("sent", False) for r in results),
+            "sent": not refused,
             "total": len(recipient_emails),
-            "details": results
+            "details": details
         }
     
     def _send_email(self, to_email: str, subject: str, body: str) -> Dict:
         """
         Internal method to send email via SMTP.
-        
+
         Returns:
             Dict with sent status and message
         """
         if not self.enabled:
-            return {"sent": False, "reason": "Not configured"}
-        
+            return _DISABLED_RESULT
+
+        # Create message
+        msg = MIMEMultipart()
+        msg['From'] = self.sender_email
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        msg.attach(MIMEText(body, 'plain'))
+        return self._send_message(msg, to_email)
+
+    def _send_message(self, msg: MIMEMultipart, to_email: str) -> Dict:
+        """Send a prebuilt message over a pooled connection. Callers that
+        reuse one skeleton across recipients (swap only the To header) can
+        call this directly and skip rebuilding the MIME tree per send."""
         try:
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = self.sender_email
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            msg.attach(MIMEText(body, 'plain'))
-            
-            # Connect and send
-            server = smtplib.SMTP(self.smtp_host, self.smtp_port)
-            server.starttls()
-            server.login(self.sender_email, self.sender_password)
-            server.send_message(msg)
-            server.quit()
-            
+            # Send over a pooled keep-alive connection, retrying transient
+            # failures with exponential backoff. Only 421 and a dropped
+            # socket force a new handshake; 450/451/454 keep the socket.
+            server = self._acquire()
+            try:
+                for attempt in range(3):
+                    try:
+                        server.send_message(msg)
+                        break
+                    except smtplib.SMTPResponseException as e:
+                        if e.smtp_code not in _TRANSIENT_SMTP_CODES or attempt == 2:
+                            raise
+                        time.sleep(2 ** attempt * 0.25)
+                        if e.smtp_code == 421:
+                            self._discard(server)
+                            server = self._connect()
+                    except smtplib.SMTPServerDisconnected:
+                        if attempt == 2:
+                            raise
+                        time.sleep(2 ** attempt * 0.25)
+                        server = self._connect()
+            except Exception:
+                self._discard(server)
+                raise
+            self._release(server, msg_count=1)
+
             return {
                 "sent": True,
                 "to": to_email,
-                "subject": subject,
+                "subject": msg['Subject'],
                 "message": "Email sent successfully"
             }
-        
+
         except Exception as e:
             return {
                 "sent": False,
@@ -1,57 +1,101 @@
 
-from sqlalchemy.orm import Session
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
 from ..infrastructure.database import SessionLocal
 from ..infrastructure import models
 from ..solver.csp_solver import CspTimetableSolver
 from ..solver.genetic_solver import GeneticTimetableSolver
 from ..solver.constraints.base import HardConstraints
-from ..domain.entities.all_entities import Teacher, Subject, Room, ClassGroup, TimeSlot
+from ..domain.entities.all_entities import Teacher, Subject, Room, ClassGroup, TimeSlot, RequiredAssignment
 from fastapi import HTTPException
 
+log = logging.getLogger(__name__)
+
+# Background solves run in worker processes: the solvers are CPU-bound and
+# would otherwise hold the GIL on FastAPI's background thread, starving
+# request handlers. Workers are only spawned on first submit.
+_SOLVER_POOL = ProcessPoolExecutor(max_workers=2)
+
+
+def _run_solver(method, teachers, subjects, rooms, groups, slots, required_assignments):
+    """Top-level (picklable) solver entry point for the process pool."""
+    if method == "genetic":
+        solver = GeneticTimetableSolver(teachers, subjects, rooms, groups, slots, required_assignments)
+    else:
+        solver = CspTimetableSolver(teachers, subjects, rooms, groups, slots, required_assignments)
+    return solver.solve()
+
+
 class TimetableService:
     @staticmethod
-    def generate_and_save(db: Session, method: str = "csp", version_name: str = "New Timetable"):
-        # 1. Fetch data
+    def _load_domain(db: Session):
+        """Fetch DB rows, convert them to solver domain entities and expand
+        lessons into required assignments. Shared by the synchronous and
+        background generation paths."""
         db_teachers = db.query(models.Teacher).all()
         db_subjects = db.query(models.Subject).all()
         db_rooms = db.query(models.Room).all()
         db_groups = db.query(models.ClassGroup).all()
         db_slots = db.query(models.TimeSlot).all()
-        db_lessons = db.query(models.Lesson).all()
+        # Eager-load the lesson M2M graph in one extra query per
+        # relationship instead of three lazy SELECTs per lesson
+        db_lessons = db.query(models.Lesson).options(
+            selectinload(models.Lesson.teachers),
+            selectinload(models.Lesson.subjects),
+            selectinload(models.Lesson.class_groups),
+        ).all()
 
-        print(f"GENERATOR: Found {len(db_lessons)} lessons, {len(db_slots)} slots, method: {method}")
-        
         # Convert DB models to Domain Entities expected by Solvers
         teachers = [Teacher(id=t.id, name=t.name, email=t.email) for t in db_teachers]
-        subjects = [Subject(id=s.id, name=s.name, code=s.code, is_lab=s.is_lab, credits=s.credits, 
+        subjects = [Subject(id=s.id, name=s.name, code=s.code, is_lab=s.is_lab, credits=s.credits,
                     required_room_type=s.required_room_type, duration_slots=s.duration_slots, teacher_id=s.teacher_id) for s in db_subjects]
         rooms = [Room(id=r.id, name=r.name, capacity=r.capacity, type=r.type) for r in db_rooms]
         groups = [ClassGroup(id=g.id, name=g.name, student_count=g.student_count) for g in db_groups]
         slots = [TimeSlot(id=s.id, day=s.day, period=s.period, start_time=s.start_time, end_time=s.end_time, is_break=s.is_break) for s in db_slots]
 
-        # Convert lessons to required assignments
+        # Convert lessons to required assignments: one flat generator per
+        # lesson extended into the list, ids from itertools.count
         required_assignments = []
-        assignment_id = 0
-        
+        next_assignment_id = count()
+
         for lesson in db_lessons:
             teacher_id = lesson.teachers[0].id if lesson.teachers else None
             subject_id = lesson.subjects[0].id if lesson.subjects else None
             group_id = lesson.class_groups[0].id if lesson.class_groups else None
-            
+
+            log.debug("Lesson %s: teacher=%s, subject=%s, group=%s, periods=%s",
+                      lesson.id, teacher_id, subject_id, group_id, lesson.lessons_per_week)
+
             if teacher_id and subject_id and group_id:
                 # Add one assignment per required lesson occurrence per week
-                for occurrence in range(lesson.lessons_per_week):
-                    required_assignments.append({
-                        'assignment_id': assignment_id,
-                        'group_id': group_id,
-                        'subject_id': subject_id,
-                        'teacher_id': teacher_id,
-                        'duration': lesson.length_per_lesson,
-                        'occurrence': occurrence + 1
-                    })
-                    assignment_id += 1
-
-        print(f"GENERATOR: Generated {len(required_assignments)} required constraints from {len(db_lessons)} lessons")
+                duration = lesson.length_per_lesson
+                required_assignments.extend(
+                    RequiredAssignment(
+                        assignment_id=next(next_assignment_id),
+                        group_id=group_id,
+                        subject_id=subject_id,
+                        teacher_id=teacher_id,
+                        duration=duration,
+                        occurrence=occurrence,
+                    )
+                    for occurrence in range(1, lesson.lessons_per_week + 1)
+                )
+
+        log.info("GENERATOR: Generated %d required constraints from %d lessons",
+                 len(required_assignments), len(db_lessons))
+        return teachers, subjects, rooms, groups, slots, required_assignments
+
+    @staticmethod
+    def generate_and_save(db: Session, method: str = "csp", version_name: str = "New Timetable"):
+        # 1. Fetch data and expand lessons
+        teachers, subjects, rooms, groups, slots, required_assignments = \
+            TimetableService._load_domain(db)
+
+        log.info("GENERATOR: method: %s", method)
 
         # Create version record
         version = models.TimetableVersion(name=version_name, algorithm=method)
@@ -69,30 +113,34 @@ class TimetableService:
 
         # Save results
         if schedule:
-            entries_created = 0
-            for item in schedule:
-                entry = models.TimetableEntry(
-                    version_id=version.id,
-                    time_slot_id=item["time_slot_id"],
-                    subject_id=item["subject_id"],
-                    room_id=item["room_id"],
-                    class_group_id=item["class_group_id"],
-                    teacher_id=item["teacher_id"]
-                )
-                db.add(entry)
-                entries_created += 1
-            
-            version.status = "active"
-            version.is_valid = True
+            # bulk_insert_mappings skips per-entry unit-of-work tracking;
+            # one executemany instead of thousands of db.add calls
+            db.bulk_insert_mappings(models.TimetableEntry, [
+                {
+                    "version_id": version.id,
+                    "time_slot_id": item["time_slot_id"],
+                    "subject_id": item["subject_id"],
+                    "room_id": item["room_id"],
+                    "class_group_id": item["class_group_id"],
+                    "teacher_id": item["teacher_id"]
+                }
+                for item in schedule
+            ])
+            entries_created = len(schedule)
+
+            # Status flip as one targeted two-column UPDATE; no
+            # unit-of-work diffing over the loaded version object
+            db.query(models.TimetableVersion).filter_by(id=version.id).update(
+                {"status": "active", "is_valid": True}, synchronize_session=False)
             db.commit()
             db.refresh(version)
-            print(f"GENERATOR: Success! Saved {entries_created} entries to DB.")
+            log.info("GENERATOR: Success! Saved %d entries to DB.", entries_created)
         else:
-            version.status = "failed"
-            version.is_valid = False
+            db.query(models.TimetableVersion).filter_by(id=version.id).update(
+                {"status": "failed", "is_valid": False}, synchronize_session=False)
             db.commit()
             db.refresh(version)
-            print("GENERATOR: Solver failed to find a valid schedule.")
+            log.warning("GENERATOR: Solver failed to find a valid schedule.")
             
         return version
 
@@ -105,14 +153,24 @@ class TimetableService:
         version = db.query(models.TimetableVersion).filter(models.TimetableVersion.id == version_id).first()
         if not version: return None
         
-        entries = version.entries
         total_slots = db.query(models.TimeSlot).filter(models.TimeSlot.is_break == False).count()
-        
+
+        # Aggregate assigned counts in SQL instead of scanning entries once
+        # per teacher/room in Python
+        counts_by_teacher = dict(db.query(
+            models.TimetableEntry.teacher_id, func.count(models.TimetableEntry.id)
+        ).filter(models.TimetableEntry.version_id == version_id)
+         .group_by(models.TimetableEntry.teacher_id).all())
+        counts_by_room = dict(db.query(
+            models.TimetableEntry.room_id, func.count(models.TimetableEntry.id)
+        ).filter(models.TimetableEntry.version_id == version_id)
+         .group_by(models.TimetableEntry.room_id).all())
+
         # 1. Teacher Utilization
         teacher_stats = []
         teachers = db.query(models.Teacher).all()
         for t in teachers:
-            assigned = sum(1 for e in entries if e.teacher_id == t.id)
+            assigned = counts_by_teacher.get(t.id, 0)
             teacher_stats.append({
                 "id": t.id,
                 "name": t.name,
@@ -120,12 +178,12 @@ class TimetableService:
                 "total_slots": t.max_hours_per_week, # Or use a different metric
                 "utilization_percentage": (assigned / t.max_hours_per_week * 100) if t.max_hours_per_week else 0
             })
-            
+
         # 2. Room Utilization
         room_stats = []
         rooms = db.query(models.Room).all()
         for r in rooms:
-            assigned = sum(1 for e in entries if e.room_id == r.id)
+            assigned = counts_by_room.get(r.id, 0)
             room_stats.append({
                 "id": r.id,
                 "name": r.name,
@@ -133,10 +191,21 @@ class TimetableService:
                 "total_slots": total_slots,
                 "utilization_percentage": (assigned / total_slots * 100) if total_slots else 0
             })
-            
+
         # 3. Conflict Detection (Redundant for auto-generated, but good for manual edits)
-        conflicts = HardConstraints.check_teacher_overlap([e.__dict__ for e in entries])
-        conflicts += HardConstraints.check_room_overlap([e.__dict__ for e in entries])
+        # One column projection shared by both overlap checks; no ORM
+        # entry instances are materialized, and yield_per streams rows in
+        # 1000-row chunks instead of buffering the whole result set
+        entry_dicts = [
+            {"teacher_id": teacher_id, "room_id": room_id, "time_slot_id": time_slot_id}
+            for teacher_id, room_id, time_slot_id in db.query(
+                models.TimetableEntry.teacher_id,
+                models.TimetableEntry.room_id,
+                models.TimetableEntry.time_slot_id,
+            ).filter(models.TimetableEntry.version_id == version_id).yield_per(1000)
+        ]
+        conflicts = HardConstraints.check_teacher_overlap(entry_dicts)
+        conflicts += HardConstraints.check_room_overlap(entry_dicts)
 
         return {
             "teacher_utilization": teacher_stats,
@@ -151,79 +220,38 @@ class TimetableService:
         try:
             version = db.query(models.TimetableVersion).filter(models.TimetableVersion.id == version_id).first()
             if not version: return
-            
-            # Fetch data (reusing logic from generate_and_save)
-            db_teachers = db.query(models.Teacher).all()
-            db_subjects = db.query(models.Subject).all()
-            db_rooms = db.query(models.Room).all()
-            db_groups = db.query(models.ClassGroup).all()
-            db_slots = db.query(models.TimeSlot).all()
-            db_lessons = db.query(models.Lesson).all()  # ADDED: Query lessons
-
-            teachers = [Teacher(id=t.id, name=t.name, email=t.email) for t in db_teachers]
-            subjects = [Subject(id=s.id, name=s.name, code=s.code, is_lab=s.is_lab, credits=s.credits, 
-                        required_room_type=s.required_room_type, duration_slots=s.duration_slots, teacher_id=s.teacher_id) for s in db_subjects]
-            rooms = [Room(id=r.id, name=r.name, capacity=r.capacity, type=r.type) for r in db_rooms]
-            groups = [ClassGroup(id=g.id, name=g.name, student_count=g.student_count) for g in db_groups]
-            slots = [TimeSlot(id=s.id, day=s.day, period=s.period, start_time=s.start_time, end_time=s.end_time, is_break=s.is_break) for s in db_slots]
-
-            # ADDED: Convert lessons to required assignments (same logic as generate_and_save)
-            required_assignments = []
-            assignment_id = 0
-            
-            print(f"DEBUG (background): Found {len(db_lessons)} lessons in database")
-            
-            for lesson in db_lessons:
-                teacher_id = lesson.teachers[0].id if lesson.teachers else None
-                subject_id = lesson.subjects[0].id if lesson.subjects else None
-                group_id = lesson.class_groups[0].id if lesson.class_groups else None
-                
-                print(f"DEBUG (background): Lesson {lesson.id}: teacher={teacher_id}, subject={subject_id}, group={group_id}, periods={lesson.lessons_per_week}")
-                
-                if teacher_id and subject_id and group_id:
-                    for occurrence in range(lesson.lessons_per_week):
-                        required_assignments.append({
-                            'assignment_id': assignment_id,
-                            'group_id': group_id,
-                            'subject_id': subject_id,
-                            'teacher_id': teacher_id,
-                            'duration': lesson.length_per_lesson,
-                            'occurrence': occurrence + 1
-                        })
-                        assignment_id += 1
-
-            print(f"DEBUG (background): Generated {len(required_assignments)} required assignments from {len(db_lessons)} lessons")
-
-            # Pass required_assignments to solver
-            if method == "genetic":
-                solver = GeneticTimetableSolver(teachers, subjects, rooms, groups, slots, required_assignments)
-                schedule = solver.solve()
-            else:
-                solver = CspTimetableSolver(teachers, subjects, rooms, groups, slots, required_assignments)
-                schedule = solver.solve()
+
+            # Fetch data and expand lessons (shared with generate_and_save)
+            teachers, subjects, rooms, groups, slots, required_assignments = \
+                TimetableService._load_domain(db)
+
+            # Solve in a worker process; the domain entities are plain
+            # dataclasses, so the inputs pickle cheaply
+            schedule = _SOLVER_POOL.submit(
+                _run_solver, method, teachers, subjects, rooms, groups, slots, required_assignments
+            ).result()
 
             if schedule:
-                for item in schedule:
-                    entry = models.TimetableEntry(
-                        version_id=version.id,
-                        time_slot_id=item["time_slot_id"],
-                        subject_id=item["subject_id"],
-                        room_id=item["room_id"],
-                        class_group_id=item["class_group_id"],
-                        teacher_id=item["teacher_id"]
-                    )
-                    db.add(entry)
-                version.status = "active"
-                version.is_valid = True
+                db.bulk_insert_mappings(models.TimetableEntry, [
+                    {
+                        "version_id": version.id,
+                        "time_slot_id": item["time_slot_id"],
+                        "subject_id": item["subject_id"],
+                        "room_id": item["room_id"],
+                        "class_group_id": item["class_group_id"],
+                        "teacher_id": item["teacher_id"]
+                    }
+                    for item in schedule
+                ])
+                status_update = {"status": "active", "is_valid": True}
             else:
-                version.status = "failed"
-                version.is_valid = False
-            
+                status_update = {"status": "failed", "is_valid": False}
+
+            db.query(models.TimetableVersion).filter_by(id=version.id).update(
+                status_update, synchronize_session=False)
             db.commit()
         except Exception as e:
-            print(f"Bkg Error: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("Background generation failed: %s", e)
             if version:
                 version.status = "error"
                 db.commit()
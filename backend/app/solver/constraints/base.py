@@ -1,47 +1,234 @@
 
+from collections import defaultdict
+from dataclasses import dataclass
 from typing import List, Dict
+
+import numpy as np
+
 from ...domain.entities.all_entities import Teacher, Subject, Room, ClassGroup, TimeSlot
 
+
+@dataclass
+class ScheduleSoA:
+    """Columnar (struct-of-arrays) view of a schedule.
+
+    One int64 array per field instead of one dict per entry: the
+    constraint checks become array ops over contiguous memory, and a
+    schedule converted once can feed every check without re-extraction.
+    None ids are stored as -1.
+    """
+    teacher_id: np.ndarray
+    room_id: np.ndarray
+    group_id: np.ndarray
+    slot_id: np.ndarray
+    subject_id: np.ndarray
+
+    _FIELD_KEYS = (
+        ("teacher_id", "teacher_id"),
+        ("room_id", "room_id"),
+        ("group_id", "class_group_id"),
+        ("slot_id", "time_slot_id"),
+        ("subject_id", "subject_id"),
+    )
+
+    @classmethod
+    def from_dicts(cls, schedule: List[Dict]) -> "ScheduleSoA":
+        n = len(schedule)
+
+        def col(key):
+            return np.fromiter(
+                (e[key] if e.get(key) is not None else -1 for e in schedule),
+                dtype=np.int64, count=n
+            )
+
+        return cls(*(col(key) for _, key in cls._FIELD_KEYS))
+
+    def to_dicts(self) -> List[Dict]:
+        """Shim for the JSON/ORM boundary; -1 maps back to None."""
+        columns = [(key, getattr(self, field)) for field, key in self._FIELD_KEYS]
+        return [
+            {key: (int(col[i]) if col[i] != -1 else None) for key, col in columns}
+            for i in range(len(self))
+        ]
+
+    def __len__(self) -> int:
+        return len(self.slot_id)
+
+
+# dict key -> ScheduleSoA attribute
+_SOA_FIELDS = {key: field for field, key in ScheduleSoA._FIELD_KEYS}
+
+
+def _mask_longest_run(mask: int) -> int:
+    """Length of the longest run of consecutive set bits in a bitmap.
+
+    Each AND with the left-shifted mask strips the first bit of every
+    run, so the number of iterations until empty is the longest run.
+    """
+    run = 0
+    while mask:
+        mask &= mask << 1
+        run += 1
+    return run
+
+
+def _column(schedule, field: str) -> np.ndarray:
+    """Extract one entry field as an int64 column; None becomes -1.
+
+    Accepts either a List[Dict] schedule or an already-columnar
+    ScheduleSoA (returned as-is, zero copy).
+    """
+    if isinstance(schedule, ScheduleSoA):
+        return getattr(schedule, _SOA_FIELDS[field])
+    return np.fromiter(
+        (entry[field] if entry[field] is not None else -1 for entry in schedule),
+        dtype=np.int64, count=len(schedule)
+    )
+
+
+def _duplicate_pairs(ids: np.ndarray, slot_ids: np.ndarray):
+    """Yield ((id, slot_id), count) for pairs occurring more than once.
+
+    Pairs are packed into single int64 keys so np.unique counts them in
+    one vectorized pass instead of a per-entry dict/tuple build.
+    """
+    stride = int(slot_ids.max()) + 2  # +2 leaves room for the -1 sentinel
+    keys, counts = np.unique((ids + 1) * stride + (slot_ids + 1), return_counts=True)
+    for key, count in zip(keys[counts > 1], counts[counts > 1]):
+        entity_id, slot_id = divmod(int(key), stride)
+        yield (entity_id - 1, slot_id - 1), int(count)
+
+
 class HardConstraints:
     @staticmethod
     def check_teacher_overlap(schedule: List[Dict]) -> List[str]:
-        conflicts = []
-        # (teacher_id, slot_id) -> list of entries
-        usage = {}
-        for entry in schedule:
-            key = (entry['teacher_id'], entry['time_slot_id'])
-            if key not in usage: usage[key] = []
-            usage[key].append(entry)
-        
-        for key, entries in usage.items():
-            if len(entries) > 1:
-                conflicts.append(f"Teacher {key[0]} has {len(entries)} classes at slot {key[1]}")
-        return conflicts
+        if not schedule:
+            return []
+        tid = _column(schedule, 'teacher_id')
+        sid = _column(schedule, 'time_slot_id')
+        return [
+            f"Teacher {teacher_id if teacher_id != -1 else None} has {count} classes at slot {slot_id}"
+            for (teacher_id, slot_id), count in _duplicate_pairs(tid, sid)
+        ]
 
     @staticmethod
     def check_room_overlap(schedule: List[Dict]) -> List[str]:
-        conflicts = []
-        usage = {}
-        for entry in schedule:
-            key = (entry['room_id'], entry['time_slot_id'])
-            if key not in usage: usage[key] = []
-            usage[key].append(entry)
-        
-        for key, entries in usage.items():
-            if len(entries) > 1:
-                conflicts.append(f"Room {key[0]} is double-booked at slot {key[1]}")
-        return conflicts
+        if not schedule:
+            return []
+        rid = _column(schedule, 'room_id')
+        sid = _column(schedule, 'time_slot_id')
+        return [
+            f"Room {room_id} is double-booked at slot {slot_id}"
+            for (room_id, slot_id), count in _duplicate_pairs(rid, sid)
+        ]
 
     @staticmethod
     def check_room_capacity(schedule: List[Dict], groups: List[ClassGroup], rooms: List[Room]) -> List[str]:
-        conflicts = []
+        if not schedule:
+            return []
         group_map = {g.id: g.student_count for g in groups}
         room_map = {r.id: r.capacity for r in rooms}
-        
-        for entry in schedule:
-            if group_map[entry['class_group_id']] > room_map[entry['room_id']]:
-                conflicts.append(f"Room {entry['room_id']} capacity too small for Group {entry['class_group_id']}")
-        return conflicts
+
+        gids = _column(schedule, 'class_group_id')
+        rids = _column(schedule, 'room_id')
+        # int32 halves the bytes the comparison kernel touches; counts
+        # and capacities are far below the 2**31 range
+        students = np.fromiter((group_map[int(g)] for g in gids), dtype=np.int32, count=len(gids))
+        capacity = np.fromiter((room_map[int(r)] for r in rids), dtype=np.int32, count=len(rids))
+
+        return [
+            f"Room {rids[i]} capacity too small for Group {gids[i]}"
+            for i in np.nonzero(students > capacity)[0]
+        ]
+
+    # Numeric fast paths: the GA only needs how many conflicts there
+    # are, not a formatted message per conflict. Same vectorized
+    # detection as the check_* variants, minus the string building.
+
+    @staticmethod
+    def count_teacher_overlap(schedule) -> int:
+        if not len(schedule):
+            return 0
+        return _conflicted_key_count(_column(schedule, 'teacher_id'),
+                                     _column(schedule, 'time_slot_id'))
+
+    @staticmethod
+    def count_room_overlap(schedule) -> int:
+        if not len(schedule):
+            return 0
+        return _conflicted_key_count(_column(schedule, 'room_id'),
+                                     _column(schedule, 'time_slot_id'))
+
+    @staticmethod
+    def count_room_capacity(schedule, groups: List[ClassGroup], rooms: List[Room]) -> int:
+        if not len(schedule):
+            return 0
+        group_map = {g.id: g.student_count for g in groups}
+        room_map = {r.id: r.capacity for r in rooms}
+        gids = _column(schedule, 'class_group_id')
+        rids = _column(schedule, 'room_id')
+        students = np.fromiter((group_map[int(g)] for g in gids), dtype=np.int32, count=len(gids))
+        capacity = np.fromiter((room_map[int(r)] for r in rids), dtype=np.int32, count=len(rids))
+        return int((students > capacity).sum())
+
+    # Boolean fast paths: evaluator inner loops usually only need "is
+    # this feasible so far?", not the full conflict report. These return
+    # at the first violation instead of scanning the whole schedule.
+
+    @staticmethod
+    def has_teacher_overlap(schedule) -> bool:
+        seen = set()
+        for teacher_id, slot_id in _iter_pairs(schedule, 'teacher_id'):
+            key = (teacher_id, slot_id)
+            if key in seen:
+                return True
+            seen.add(key)
+        return False
+
+    @staticmethod
+    def has_room_overlap(schedule) -> bool:
+        seen = set()
+        for room_id, slot_id in _iter_pairs(schedule, 'room_id'):
+            key = (room_id, slot_id)
+            if key in seen:
+                return True
+            seen.add(key)
+        return False
+
+    @staticmethod
+    def has_room_capacity_violation(schedule, groups: List[ClassGroup], rooms: List[Room]) -> bool:
+        group_map = {g.id: g.student_count for g in groups}
+        room_map = {r.id: r.capacity for r in rooms}
+        for group_id, room_id in _iter_pairs(schedule, 'class_group_id', 'room_id'):
+            if group_map[group_id] > room_map[room_id]:
+                return True
+        return False
+
+
+# Packed keys below this stay dense enough for a bincount occupancy
+# table (O(N + range)) to beat np.unique's sort (O(N log N))
+_BINCOUNT_RANGE_CAP = 1 << 20
+
+
+def _conflicted_key_count(ids: np.ndarray, slot_ids: np.ndarray) -> int:
+    """Number of distinct (id, slot) pairs that occur more than once."""
+    stride = int(slot_ids.max()) + 2
+    keys = (ids + 1) * stride + (slot_ids + 1)
+    key_range = int(keys.max()) + 1
+    if key_range <= _BINCOUNT_RANGE_CAP:
+        # Flat occupancy table: one scatter-increment pass, no sort
+        return int((np.bincount(keys, minlength=key_range) > 1).sum())
+    _, counts = np.unique(keys, return_counts=True)
+    return int((counts > 1).sum())
+
+
+def _iter_pairs(schedule, field: str, second: str = 'time_slot_id'):
+    """Iterate (field, second) pairs from either schedule representation."""
+    if isinstance(schedule, ScheduleSoA):
+        return zip(getattr(schedule, _SOA_FIELDS[field]).tolist(),
+                   getattr(schedule, _SOA_FIELDS[second]).tolist())
+    return ((entry[field], entry[second]) for entry in schedule)
+
 
 class SoftConstraints:
     @staticmethod
@@ -51,45 +238,40 @@ class SoftConstraints:
         A gap is when a teacher has free periods between classes on the same day.
         """
         penalty = 0.0
-        
-        # Group schedule by teacher and day
-        teacher_schedules = {}
+
+        # O(1) slot lookups instead of scanning the slot list per entry
+        slot_by_id = {s.id: s for s in slots}
+
+        # Per-(teacher, day) period set as an int bitmap: insertion is a
+        # shift-or, and first/last/count fall out of bit arithmetic with
+        # no per-day list build or sort
+        teacher_schedules = defaultdict(lambda: defaultdict(int))
         for entry in schedule:
             tid = entry['teacher_id']
             if not tid:
                 continue
-            if tid not in teacher_schedules:
-                teacher_schedules[tid] = {}
-            
-            # Find the slot to get day information
-            slot = next((s for s in slots if s.id == entry['time_slot_id']), None)
+
+            slot = slot_by_id.get(entry['time_slot_id'])
             if not slot or slot.is_break:
                 continue
-            
-            day = slot.day
-            if day not in teacher_schedules[tid]:
-                teacher_schedules[tid][day] = []
-            teacher_schedules[tid][day].append(slot.period)
-        
+
+            teacher_schedules[tid][slot.day] |= 1 << slot.period
+
         # Calculate gaps for each teacher on each day
         for tid, days in teacher_schedules.items():
-            for day, periods in days.items():
-                if len(periods) <= 1:
+            for day, mask in days.items():
+                classes = mask.bit_count()
+                if classes <= 1:
                     continue  # No gaps possible with 0 or 1 class
-                
-                # Sort periods
-                sorted_periods = sorted(periods)
-                
+
                 # Count gaps (missing periods between first and last class)
-                first_period = sorted_periods[0]
-                last_period = sorted_periods[-1]
-                total_span = last_period - first_period + 1
-                actual_classes = len(sorted_periods)
-                gaps = total_span - actual_classes
-                
+                first_period = (mask & -mask).bit_length() - 1
+                last_period = mask.bit_length() - 1
+                gaps = (last_period - first_period + 1) - classes
+
                 # Penalize each gap
                 penalty += gaps * 10.0
-        
+
         return penalty
 
     @staticmethod
@@ -105,17 +287,13 @@ class SoftConstraints:
             if tid and tid in teacher_loads:
                 teacher_loads[tid] += 1
         
-        # Calculate standard deviation
-        loads = list(teacher_loads.values())
-        if not loads:
+        # Population standard deviation via numpy's C kernel
+        loads = np.fromiter(teacher_loads.values(), dtype=np.int16, count=len(teacher_loads))
+        if loads.size == 0:
             return 0.0
-        
-        mean = sum(loads) / len(loads)
-        variance = sum((x - mean) ** 2 for x in loads) / len(loads)
-        std_dev = variance ** 0.5
-        
+
         # Penalize based on standard deviation
-        return std_dev * 5.0
+        return float(loads.std()) * 5.0
     
     @staticmethod
     def consecutive_classes_penalty(schedule: List[Dict], slots: List[TimeSlot]) -> float:
@@ -124,38 +302,27 @@ class SoftConstraints:
         More than 3 consecutive classes is tiring.
         """
         penalty = 0.0
-        
-        # Group by teacher and day
-        teacher_day_schedules = {}
+
+        # O(1) slot lookups instead of scanning the slot list per entry
+        slot_by_id = {s.id: s for s in slots}
+
+        # Group by teacher and day into period bitmaps
+        teacher_day_schedules = defaultdict(int)
         for entry in schedule:
             tid = entry.get('teacher_id')
             if not tid:
                 continue
-            
-            slot = next((s for s in slots if s.id == entry['time_slot_id']), None)
+
+            slot = slot_by_id.get(entry['time_slot_id'])
             if not slot or slot.is_break:
                 continue
-            
-            key = (tid, slot.day)
-            if key not in teacher_day_schedules:
-                teacher_day_schedules[key] = []
-            teacher_day_schedules[key].append(slot.period)
-        
-        # Check for long consecutive sequences
-        for (tid, day), periods in teacher_day_schedules.items():
-            sorted_periods = sorted(periods)
-            
-            # Find consecutive sequences
-            consecutive_count = 1
-            max_consecutive = 1
-            
-            for i in range(1, len(sorted_periods)):
-                if sorted_periods[i] == sorted_periods[i-1] + 1:
-                    consecutive_count += 1
-                    max_consecutive = max(max_consecutive, consecutive_count)
-                else:
-                    consecutive_count = 1
-            
+
+            teacher_day_schedules[(tid, slot.day)] |= 1 << slot.period
+
+        # Check for long consecutive sequences (pure integer ops)
+        for mask in teacher_day_schedules.values():
+            max_consecutive = _mask_longest_run(mask)
+
             # Penalize if more than 3 consecutive classes
             if max_consecutive > 3:
                 penalty += (max_consecutive - 3) * 8.0
@@ -167,10 +334,44 @@ class SoftConstraints:
         """
         Calculate total soft constraint penalty.
         Lower score is better.
+
+        Fused implementation: one traversal of the schedule feeds
+        workload counting and the per-teacher/day period groups, and one
+        loop over the groups scores gaps and consecutive runs from the
+        same period bitmap. Same arithmetic as calling the three scoring
+        functions separately, a third of the passes.
         """
-        gap_penalty = SoftConstraints.calculate_gaps(schedule, teachers, slots)
-        balance_penalty = SoftConstraints.balance_workload(schedule, teachers)
-        consecutive_penalty = SoftConstraints.consecutive_classes_penalty(schedule, slots)
-        
-        return gap_penalty + balance_penalty + consecutive_penalty
+        slot_by_id = {s.id: s for s in slots}
+        teacher_loads = {t.id: 0 for t in teachers}
+        teacher_day_periods = defaultdict(lambda: defaultdict(int))
+
+        for tid, slot_id in _iter_pairs(schedule, 'teacher_id'):
+            if not tid or tid == -1:
+                continue
+            if tid in teacher_loads:
+                teacher_loads[tid] += 1
+
+            slot = slot_by_id.get(slot_id)
+            if not slot or slot.is_break:
+                continue
+            teacher_day_periods[tid][slot.day] |= 1 << slot.period
+
+        penalty = 0.0
+        for tid, days in teacher_day_periods.items():
+            for day, mask in days.items():
+                classes = mask.bit_count()
+                if classes <= 1:
+                    continue
+                first = (mask & -mask).bit_length() - 1
+                last = mask.bit_length() - 1
+                penalty += (last - first + 1 - classes) * 10.0
+                max_consecutive = _mask_longest_run(mask)
+                if max_consecutive > 3:
+                    penalty += (max_consecutive - 3) * 8.0
+
+        loads = np.fromiter(teacher_loads.values(), dtype=np.int16, count=len(teacher_loads))
+        if loads.size:
+            penalty += float(loads.std()) * 5.0
+
+        return penalty
 
@@ -1,125 +1,153 @@
+import os
+from collections import defaultdict
+
 from ortools.sat.python import cp_model
 from typing import List, Dict, Any
-from ..domain.entities.all_entities import Teacher, Subject, Room, ClassGroup, TimeSlot
+from ..domain.entities.all_entities import Teacher, Subject, Room, ClassGroup, TimeSlot, RequiredAssignment
 
 class CspTimetableSolver:
-    def __init__(self, teachers: List[Teacher], subjects: List[Subject], 
+    def __init__(self, teachers: List[Teacher], subjects: List[Subject],
                  rooms: List[Room], groups: List[ClassGroup], slots: List[TimeSlot],
-                 required_assignments: List[Dict[str, Any]] = None):
+                 required_assignments: List[RequiredAssignment] = None,
+                 num_workers: int = None, max_time_in_seconds: float = 120.0,
+                 random_seed: int = 0, use_cartesian: bool = False):
         self.teachers = teachers
         self.subjects = subjects
         self.rooms = rooms
         self.groups = groups
         self.slots = slots
         self.required_assignments = required_assignments or []
+        # CP-SAT portfolio search scales with worker threads; default to
+        # every core. Fixed random_seed keeps runs reproducible.
+        self.num_workers = num_workers or (os.cpu_count() or 8)
+        self.max_time_in_seconds = max_time_in_seconds
+        self.random_seed = random_seed
+        self.use_cartesian = use_cartesian
         self.model = cp_model.CpModel()
         self.vars = {} # (assignment_idx, room, slot) -> BoolVar
+        # Lookups derived purely from static input, hoisted out of the
+        # solve/extract loops that previously recomputed them
+        self.non_break_slots = [t for t in slots if not t.is_break]
+        self.slot_by_id = {t.id: t for t in slots}
+        self.slot_by_day_period = {(t.day, t.period): t for t in slots}
 
     def solve(self):
-        # If no required assignments provided, fall back to old behavior
+        # Without explicit required assignments, synthesize one per
+        # (group, subject) pair: |G|x|S| assignment vars per room/slot
+        # instead of the full |G|x|S|x|R|x|T| cartesian model. The old
+        # formulation is kept behind use_cartesian for comparison runs.
         if not self.required_assignments:
-            print("WARNING: No required assignments provided, using cartesian product (may fail)")
-            return self._solve_cartesian()
+            if self.use_cartesian:
+                print("WARNING: No required assignments provided, using cartesian product (may fail)")
+                return self._solve_cartesian()
+            print("CSP SOLVER: No required assignments provided; synthesizing one per (group, subject)")
+            self.required_assignments = [
+                RequiredAssignment(
+                    assignment_id=idx,
+                    group_id=g.id,
+                    subject_id=s.id,
+                    teacher_id=s.teacher_id,
+                    duration=s.duration_slots,
+                )
+                for idx, (g, s) in enumerate(
+                    (g, s) for g in self.groups for s in self.subjects
+                )
+            ]
         
         print(f"CSP SOLVER: Starting with {len(self.required_assignments)} required assignments")
-        print(f"CSP SOLVER: Available resources - {len(self.rooms)} rooms, {len([s for s in self.slots if not s.is_break])} slots")
+        print(f"CSP SOLVER: Available resources - {len(self.rooms)} rooms, {len(self.non_break_slots)} slots")
         
-        # 1. Create Variables - one for each required assignment × room × slot
+        # 1. Create Variables - one for each required assignment × room × slot.
+        # Inverted indices are filled at creation time so the constraint
+        # blocks below iterate flat lists instead of re-enumerating the
+        # assignment×room×slot cube per constraint.
+        # Assignment indices are dense 0..n-1, so a plain list avoids the
+        # per-append dict hashing the keyed indices below still need
+        vars_by_idx = [[] for _ in self.required_assignments]
+        by_group_slot = defaultdict(list)
+        by_room_slot = defaultdict(list)
+        by_teacher_slot = defaultdict(list)
+        by_room = defaultdict(list)
+
         for idx, assignment in enumerate(self.required_assignments):
             for r in self.rooms:
-                for t in self.slots:
-                    if t.is_break:
-                        continue
-                    
+                for t in self.non_break_slots:
                     # Create variable for this assignment at this room and slot
-                    self.vars[(idx, r.id, t.id)] = self.model.NewBoolVar(
-                        f'x_a{idx}_r{r.id}_t{t.id}'
-                    )
+                    var = self.model.NewBoolVar(f'x_a{idx}_r{r.id}_t{t.id}')
+                    self.vars[(idx, r.id, t.id)] = var
+                    vars_by_idx[idx].append(var)
+                    by_group_slot[(assignment.group_id, t.id)].append(var)
+                    by_room_slot[(r.id, t.id)].append(var)
+                    by_room[r.id].append(var)
+                    if assignment.teacher_id:
+                        by_teacher_slot[(assignment.teacher_id, t.id)].append(var)
 
         print(f"CSP SOLVER: Created {len(self.vars)} variables")
 
         # 2. Constraints
-        
+
         # C1: Each assignment SHOULD be scheduled (relaxed from MUST to allow partial solutions)
         # Instead of == 1, we use <= 1 to allow some assignments to be skipped if needed
-        for idx in range(len(self.required_assignments)):
-            assignment_vars = []
-            for r in self.rooms:
-                for t in self.slots:
-                    if not t.is_break and (idx, r.id, t.id) in self.vars:
-                        assignment_vars.append(self.vars[(idx, r.id, t.id)])
-            if assignment_vars:
-                # RELAXED: Allow assignment to be scheduled 0 or 1 times (not forcing exactly 1)
-                self.model.Add(sum(assignment_vars) <= 1)
-        print(f"CSP SOLVER: Added {len(self.required_assignments)} assignment constraints (relaxed)")
+        for assignment_vars in vars_by_idx:
+            # RELAXED: Allow assignment to be scheduled 0 or 1 times (not forcing exactly 1)
+            self.model.AddAtMostOne(assignment_vars)
+        print(f"CSP SOLVER: Added {len(vars_by_idx)} assignment constraints (relaxed)")
 
         # C2: Group No Overlaps - a group can't have multiple classes at same time
-        overlap_count = 0
-        for t in self.slots:
-            if t.is_break:
-                continue
-            for group_id in set(a['group_id'] for a in self.required_assignments):
-                group_vars = []
-                for idx, assignment in enumerate(self.required_assignments):
-                    if assignment['group_id'] == group_id:
-                        for r in self.rooms:
-                            if (idx, r.id, t.id) in self.vars:
-                                group_vars.append(self.vars[(idx, r.id, t.id)])
-                if group_vars:
-                    self.model.Add(sum(group_vars) <= 1)
-                    overlap_count += 1
-        print(f"CSP SOLVER: Added {overlap_count} group overlap constraints")
+        for group_vars in by_group_slot.values():
+            self.model.AddAtMostOne(group_vars)
+        print(f"CSP SOLVER: Added {len(by_group_slot)} group overlap constraints")
 
         # C3: Room No Overlaps - a room can't have multiple classes at same time
-        room_overlap_count = 0
-        for r in self.rooms:
-            for t in self.slots:
-                if t.is_break:
-                    continue
-                room_vars = []
-                for idx in range(len(self.required_assignments)):
-                    if (idx, r.id, t.id) in self.vars:
-                        room_vars.append(self.vars[(idx, r.id, t.id)])
-                if room_vars:
-                    self.model.Add(sum(room_vars) <= 1)
-                    room_overlap_count += 1
-        print(f"CSP SOLVER: Added {room_overlap_count} room overlap constraints")
+        for room_vars in by_room_slot.values():
+            self.model.AddAtMostOne(room_vars)
+        print(f"CSP SOLVER: Added {len(by_room_slot)} room overlap constraints")
 
         # C4: Teacher No Overlaps - a teacher can't teach multiple classes at same time
-        teacher_overlap_count = 0
-        for t in self.slots:
-            if t.is_break:
+        for teacher_vars in by_teacher_slot.values():
+            self.model.AddAtMostOne(teacher_vars)
+        print(f"CSP SOLVER: Added {len(by_teacher_slot)} teacher overlap constraints")
+
+        # Symmetry breaking: rooms with the same (type, capacity) are
+        # interchangeable, so any solution can be relabelled across them.
+        # Ordering their usage counts keeps only one representative per
+        # permutation class and prunes k! symmetric branches per class.
+        rooms_by_class = defaultdict(list)
+        for r in self.rooms:
+            rooms_by_class[(r.type, r.capacity)].append(r)
+        symmetry_constraints = 0
+        for equivalent in rooms_by_class.values():
+            if len(equivalent) < 2:
                 continue
-            for teacher_id in set(a['teacher_id'] for a in self.required_assignments if a['teacher_id']):
-                teacher_vars = []
-                for idx, assignment in enumerate(self.required_assignments):
-                    if assignment.get('teacher_id') == teacher_id:
-                        for r in self.rooms:
-                            if (idx, r.id, t.id) in self.vars:
-                                teacher_vars.append(self.vars[(idx, r.id, t.id)])
-                if teacher_vars:
-                    self.model.Add(sum(teacher_vars) <= 1)
-                    teacher_overlap_count += 1
-        print(f"CSP SOLVER: Added {teacher_overlap_count} teacher overlap constraints")
+            equivalent.sort(key=lambda r: r.id)
+            usage = [cp_model.LinearExpr.Sum(by_room[r.id]) for r in equivalent]
+            for i in range(len(usage) - 1):
+                self.model.Add(usage[i] >= usage[i + 1])
+                symmetry_constraints += 1
+        if symmetry_constraints:
+            print(f"CSP SOLVER: Added {symmetry_constraints} room symmetry-breaking constraints")
 
         # OPTIMIZATION: Maximize number of assignments scheduled
         # This helps the solver find partial solutions if full solution is impossible
-        all_assignment_vars = []
-        for idx in range(len(self.required_assignments)):
-            for r in self.rooms:
-                for t in self.slots:
-                    if not t.is_break and (idx, r.id, t.id) in self.vars:
-                        all_assignment_vars.append(self.vars[(idx, r.id, t.id)])
-        
-        if all_assignment_vars:
-            self.model.Maximize(sum(all_assignment_vars))
+        if self.vars:
+            self.model.Maximize(cp_model.LinearExpr.Sum(list(self.vars.values())))
             print(f"CSP SOLVER: Added optimization objective to maximize scheduled assignments")
 
+        # Warm start: seed the search with a greedy placement so CP-SAT
+        # begins from a near-feasible point instead of cold
+        hinted = self._greedy_hint()
+        if hinted:
+            print(f"CSP SOLVER: Hinted {hinted} assignments from greedy placement")
+
         # 3. Solve
-        print("CSP SOLVER: Starting solver (max 120 seconds)...")
+        print(f"CSP SOLVER: Starting solver (max {self.max_time_in_seconds:.0f} seconds)...")
         solver = cp_model.CpSolver()
-        solver.parameters.max_time_in_seconds = 120.0  # Increased timeout
-        solver.parameters.num_search_workers = 4  # Parallel search
+        solver.parameters.max_time_in_seconds = self.max_time_in_seconds
+        solver.parameters.num_workers = self.num_workers  # Parallel portfolio search
+        solver.parameters.random_seed = self.random_seed
+        if hinted:
+            # Let the solver patch an imperfect hint rather than discard it
+            solver.parameters.repair_hint = True
         status = solver.Solve(self.model)
 
         print(f"CSP SOLVER: Solver finished with status: {status}")
@@ -138,124 +166,136 @@ class CspTimetableSolver:
             print(f"CSP SOLVER: Returning None (no solution)")
             return None
     
+    def _greedy_hint(self) -> int:
+        """Hint the model with a round-robin greedy placement.
+
+        Walks the assignments once, placing each in the first room/slot
+        (offset by the assignment index so placements spread out) whose
+        group, room and teacher are still free at that slot. Returns the
+        number of assignments hinted; 0 when there is nothing to place.
+        """
+        if not self.required_assignments or not self.rooms or not self.non_break_slots:
+            return 0
+
+        used_group_slot = set()
+        used_room_slot = set()
+        used_teacher_slot = set()
+        n_slots = len(self.non_break_slots)
+        n_rooms = len(self.rooms)
+        hinted = 0
+
+        for idx, assignment in enumerate(self.required_assignments):
+            for j in range(n_slots):
+                t = self.non_break_slots[(idx + j) % n_slots]
+                if (assignment.group_id, t.id) in used_group_slot:
+                    continue
+                if assignment.teacher_id and (assignment.teacher_id, t.id) in used_teacher_slot:
+                    continue
+                room = next(
+                    (self.rooms[(idx + k) % n_rooms] for k in range(n_rooms)
+                     if (self.rooms[(idx + k) % n_rooms].id, t.id) not in used_room_slot),
+                    None,
+                )
+                if room is None:
+                    continue
+                used_group_slot.add((assignment.group_id, t.id))
+                used_room_slot.add((room.id, t.id))
+                if assignment.teacher_id:
+                    used_teacher_slot.add((assignment.teacher_id, t.id))
+                self.model.AddHint(self.vars[(idx, room.id, t.id)], 1)
+                hinted += 1
+                break
+
+        return hinted
+
+    def _selected_keys(self, solver):
+        """Keys of the variables set to 1, read in bulk from the response.
+
+        One pass over the raw solution array in the response proto
+        instead of a proto-crossing solver.Value() call per variable.
+        """
+        solution = solver.ResponseProto().solution
+        return [
+            key for key, var in self.vars.items()
+            if solution[var.Index()] == 1
+        ]
+
     def _extract_solution_from_assignments(self, solver):
         """Extract solution from assignment-based variables"""
         schedule = []
-        slot_info = {t.id: t for t in self.slots}
-        
-        for key, var in self.vars.items():
-            if solver.Value(var) == 1:
-                idx, rid, tid = key
-                assignment = self.required_assignments[idx]
-                slot = slot_info.get(tid)
-                
-                schedule.append({
-                    "class_group_id": assignment['group_id'],
-                    "subject_id": assignment['subject_id'],
-                    "room_id": rid,
-                    "time_slot_id": tid,
-                    "teacher_id": assignment['teacher_id'],
-                    "day": slot.day,
-                    "period": slot.period
-                })
-        
+
+        for idx, rid, tid in self._selected_keys(solver):
+            assignment = self.required_assignments[idx]
+            slot = self.slot_by_id.get(tid)
+
+            schedule.append({
+                "class_group_id": assignment.group_id,
+                "subject_id": assignment.subject_id,
+                "room_id": rid,
+                "time_slot_id": tid,
+                "teacher_id": assignment.teacher_id,
+                "day": slot.day,
+                "period": slot.period
+            })
+
         return schedule
     
     def _solve_cartesian(self):
         """Old cartesian product method - fallback only"""
-        # 1. Create Variables - create for ALL combinations
+        # 1. Create Variables - create for ALL combinations, filling the
+        # inverted indices the constraint blocks iterate directly
         print("DEBUG: Creating variables...")
+        by_group_subject = defaultdict(list)
+        by_group_slot = defaultdict(list)
+        by_room_slot = defaultdict(list)
+        by_teacher_slot = defaultdict(list)
+
         for g in self.groups:
             for s in self.subjects:
                 for r in self.rooms:
-                    for t in self.slots:
-                        if t.is_break: 
-                            continue
-                        
+                    for t in self.non_break_slots:
                         # Create variables for ALL non-break slots
-                        self.vars[(g.id, s.id, r.id, t.id)] = self.model.NewBoolVar(
-                            f'x_g{g.id}_s{s.id}_r{r.id}_t{t.id}'
-                        )
+                        var = self.model.NewBoolVar(f'x_g{g.id}_s{s.id}_r{r.id}_t{t.id}')
+                        self.vars[(g.id, s.id, r.id, t.id)] = var
+                        by_group_subject[(g.id, s.id)].append(var)
+                        by_group_slot[(g.id, t.id)].append(var)
+                        by_room_slot[(r.id, t.id)].append(var)
+                        if s.teacher_id:
+                            by_teacher_slot[(s.teacher_id, t.id)].append(var)
 
         print(f"DEBUG: Created {len(self.vars)} variables")
-        print(f"DEBUG: Groups: {len(self.groups)}, Subjects: {len(self.subjects)}, Rooms: {len(self.rooms)}, Non-break slots: {len([t for t in self.slots if not t.is_break])}")
+        print(f"DEBUG: Groups: {len(self.groups)}, Subjects: {len(self.subjects)}, Rooms: {len(self.rooms)}, Non-break slots: {len(self.non_break_slots)}")
 
         # 2. Constraints
         print(f"DEBUG: Applying constraints...")
-        
-        # Helper: Get all variables for a group at a specific slot
-        def get_group_slot_vars(group_id, slot_id):
-            vars_list = []
-            for s in self.subjects:
-                for r in self.rooms:
-                    if (group_id, s.id, r.id, slot_id) in self.vars:
-                        vars_list.append(self.vars[(group_id, s.id, r.id, slot_id)])
-            return vars_list
 
         # C1: REQUIREMENT - Each group must have each subject exactly once
-        req_count = 0
-        for g in self.groups:
-            for s in self.subjects:
-                # All time slots for this group + subject combination
-                subject_vars = []
-                for r in self.rooms:
-                    for t in self.slots:
-                        if not t.is_break and (g.id, s.id, r.id, t.id) in self.vars:
-                            subject_vars.append(self.vars[(g.id, s.id, r.id, t.id)])
-                if subject_vars:
-                    # Group must have subject exactly once (across all slots)
-                    self.model.Add(sum(subject_vars) == 1)
-                    req_count += 1
-        print(f"DEBUG: Added {req_count} requirement constraints (each group-subject once)")
+        for subject_vars in by_group_subject.values():
+            # Group must have subject exactly once (across all slots)
+            self.model.AddExactlyOne(subject_vars)
+        print(f"DEBUG: Added {len(by_group_subject)} requirement constraints (each group-subject once)")
 
         # C2: Group No Overlaps (at slot level)
-        overlap_count = 0
-        for g in self.groups:
-            for t in self.slots:
-                if t.is_break: continue
-                g_vars = get_group_slot_vars(g.id, t.id)
-                if g_vars:
-                    self.model.Add(sum(g_vars) <= 1)
-                    overlap_count += 1
-        print(f"DEBUG: Added {overlap_count} group overlap constraints")
+        for g_vars in by_group_slot.values():
+            self.model.AddAtMostOne(g_vars)
+        print(f"DEBUG: Added {len(by_group_slot)} group overlap constraints")
 
         # C3: Room No Overlaps
-        room_overlap_count = 0
-        for r in self.rooms:
-            for t in self.slots:
-                if t.is_break: continue
-                r_vars = []
-                for g in self.groups:
-                    for s in self.subjects:
-                        if (g.id, s.id, r.id, t.id) in self.vars:
-                            r_vars.append(self.vars[(g.id, s.id, r.id, t.id)])
-                if r_vars:
-                    self.model.Add(sum(r_vars) <= 1)
-                    room_overlap_count += 1
-        print(f"DEBUG: Added {room_overlap_count} room overlap constraints")
+        for r_vars in by_room_slot.values():
+            self.model.AddAtMostOne(r_vars)
+        print(f"DEBUG: Added {len(by_room_slot)} room overlap constraints")
 
         # C4: Teacher No Overlaps
-        teacher_map = {s.id: s.teacher_id for s in self.subjects if s.teacher_id}
-        teacher_overlap_count = 0
-        for tid in set(teacher_map.values()):
-            for t in self.slots:
-                if t.is_break: continue
-                t_vars = []
-                for s in self.subjects:
-                    if s.teacher_id == tid:
-                        for g in self.groups:
-                            for r in self.rooms:
-                                if (g.id, s.id, r.id, t.id) in self.vars:
-                                    t_vars.append(self.vars[(g.id, s.id, r.id, t.id)])
-                if t_vars:
-                    self.model.Add(sum(t_vars) <= 1)
-                    teacher_overlap_count += 1
-        print(f"DEBUG: Added {teacher_overlap_count} teacher overlap constraints")
+        for t_vars in by_teacher_slot.values():
+            self.model.AddAtMostOne(t_vars)
+        print(f"DEBUG: Added {len(by_teacher_slot)} teacher overlap constraints")
 
         # 3. Solve
         print("DEBUG: Solving...")
         solver = cp_model.CpSolver()
         solver.parameters.log_search_progress = True  # Enable logging
+        solver.parameters.num_workers = self.num_workers
+        solver.parameters.random_seed = self.random_seed
         status = solver.Solve(self.model)
 
         if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
@@ -268,38 +308,35 @@ class CspTimetableSolver:
         schedule = []
         subject_to_teacher = {s.id: s.teacher_id for s in self.subjects}
         subject_info = {s.id: s for s in self.subjects}
-        slot_info = {t.id: t for t in self.slots}
-        
-        for key, var in self.vars.items():
-            if solver.Value(var) == 1:
-                gid, sid, rid, tid = key
-                subject = subject_info.get(sid)
-                slot = slot_info.get(tid)
-                
-                # Add the main entry
-                schedule.append({
-                    "class_group_id": gid,
-                    "subject_id": sid,
-                    "room_id": rid,
-                    "time_slot_id": tid,
-                    "teacher_id": subject_to_teacher.get(sid),
-                    "day": slot.day,
-                    "period": slot.period
-                })
-                
-                # If Lab, add the implicit following slot (Period 6)
-                if subject.is_lab and subject.duration_slots > 1 and slot.period == 5:
-                    # Find period 6 slot
-                    p6_slot = next((t for t in self.slots if t.day == slot.day and t.period == 6), None)
-                    if p6_slot:
-                        schedule.append({
-                            "class_group_id": gid,
-                            "subject_id": sid,
-                            "room_id": rid,
-                            "time_slot_id": p6_slot.id,
-                            "teacher_id": subject_to_teacher.get(sid),
-                            "day": slot.day,
-                            "period": 6
-                        })
+
+        for gid, sid, rid, tid in self._selected_keys(solver):
+            subject = subject_info.get(sid)
+            slot = self.slot_by_id.get(tid)
+
+            # Add the main entry
+            schedule.append({
+                "class_group_id": gid,
+                "subject_id": sid,
+                "room_id": rid,
+                "time_slot_id": tid,
+                "teacher_id": subject_to_teacher.get(sid),
+                "day": slot.day,
+                "period": slot.period
+            })
+
+            # If Lab, add the implicit following slot (Period 6)
+            if subject.is_lab and subject.duration_slots > 1 and slot.period == 5:
+                # Find period 6 slot
+                p6_slot = self.slot_by_day_period.get((slot.day, 6))
+                if p6_slot:
+                    schedule.append({
+                        "class_group_id": gid,
+                        "subject_id": sid,
+                        "room_id": rid,
+                        "time_slot_id": p6_slot.id,
+                        "teacher_id": subject_to_teacher.get(sid),
+                        "day": slot.day,
+                        "period": 6
+                    })
         
         return schedule
@@ -1,96 +1,324 @@
 
+import os
 import random
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Any
-from .constraints.base import HardConstraints, SoftConstraints
+
+import numpy as np
+
+from .constraints.base import HardConstraints, ScheduleSoA, _mask_longest_run
 from ..domain.entities.all_entities import Teacher, Subject, Room, ClassGroup, TimeSlot
 
+# Worker-process context for parallel evaluation: the solver (plain
+# picklable attributes) is shipped once via the pool initializer
+# instead of being pickled with every task.
+_WORKER_SOLVER = None
+
+
+def _init_worker(solver):
+    global _WORKER_SOLVER
+    _WORKER_SOLVER = solver
+
+
+def _fitness_worker(individual):
+    return _WORKER_SOLVER._fitness(individual)
+
+
+def _generate_worker(_index):
+    return _WORKER_SOLVER._generate_random_individual()
+
+
+def _evolve_island_worker(population, generations):
+    return _WORKER_SOLVER._evolve_population(population, generations)
+
+
 class GeneticTimetableSolver:
-    def __init__(self, teachers, subjects, rooms, groups, slots, 
-                 pop_size=50, generations=100, mutation_rate=0.1):
+    def __init__(self, teachers, subjects, rooms, groups, slots,
+                 required_assignments=None,
+                 pop_size=50, generations=100, mutation_rate=0.1,
+                 parallel_fitness=False, islands=1, migration_interval=10):
         self.teachers = teachers
         self.subjects = subjects
         self.rooms = rooms
         self.groups = groups
         self.slots = [s for s in slots if not s.is_break]
+        # Accepted for interface parity with the CSP solver; the GA still
+        # derives its genome from the group x subject grid
+        self.required_assignments = required_assignments or []
         self.pop_size = pop_size
         self.generations = generations
         self.mutation_rate = mutation_rate
-
-    def _generate_random_individual(self) -> List[Dict]:
-        individual = []
+        # Opt in explicitly: forking workers only pays off when the
+        # per-generation fitness work outweighs the pickling round trip
+        self.parallel_fitness = parallel_fitness
+        # islands > 1 switches to a multi-deme run: each island evolves
+        # pop_size // islands individuals in its own process and trades
+        # its best two around a ring every migration_interval generations
+        self.islands = islands
+        self.migration_interval = migration_interval
+        # Room eligibility never changes during a run, so group rooms by
+        # type once instead of rescanning the room list for every
+        # (individual, subject) pair during population generation
+        self._rooms_by_type = {}
+        for r in self.rooms:
+            self._rooms_by_type.setdefault(r.type, []).append(r)
+        # Genome template: gene order is the (group, subject) grid and
+        # only slot and room vary per individual, so the group, subject
+        # and teacher columns are built once and shared (read-only) by
+        # every ScheduleSoA individual. Candidate room ids are padded
+        # into a matrix so a whole genome's rooms come from one
+        # fancy-indexing draw instead of per-gene random.choice calls.
+        gene_static = []  # (group_id, subject_id, teacher_id) per gene
+        gene_rooms = []
         for g in self.groups:
             for s in self.subjects:
-                # Basic assignment
-                slot = random.choice(self.slots)
-                valid_rooms = [r for r in self.rooms if r.type == s.required_room_type]
-                room = random.choice(valid_rooms) if valid_rooms else self.rooms[0]
-                
-                individual.append({
-                    "class_group_id": g.id,
-                    "subject_id": s.id,
-                    "room_id": room.id,
-                    "time_slot_id": slot.id,
-                    "teacher_id": s.teacher_id
-                })
-        return individual
-
-    def _fitness(self, individual: List[Dict]) -> float:
-        score = 10000.0
-        
-        # 1. Hard Constraints (Severe Penalties)
-        h_conflicts = HardConstraints.check_teacher_overlap(individual)
-        h_conflicts += HardConstraints.check_room_overlap(individual)
-        h_conflicts += HardConstraints.check_room_capacity(individual, self.groups, self.rooms)
-        
-        score -= len(h_conflicts) * 1000
-        
-        # 2. Soft Constraints (Minor Penalties)
-        soft_penalty = SoftConstraints.total_soft_score(individual, self.teachers, self.slots)
-        score -= soft_penalty
-        
-        return max(0.0, score)
+                gene_static.append((g.id, s.id, s.teacher_id if s.teacher_id is not None else -1))
+                candidates = self._rooms_by_type.get(s.required_room_type) or [self.rooms[0]]
+                gene_rooms.append([r.id for r in candidates])
+        static = np.array(gene_static, dtype=np.int64).reshape(len(gene_static), 3)
+        self._group_col = static[:, 0]
+        self._subject_col = static[:, 1]
+        self._teacher_col = static[:, 2]
+        self._slot_id_arr = np.array([s.id for s in self.slots], dtype=np.int64)
+        self._room_counts = np.array([len(ids) for ids in gene_rooms], dtype=np.int64)
+        width = max((len(ids) for ids in gene_rooms), default=1)
+        self._room_matrix = np.zeros((len(gene_rooms), width), dtype=np.int64)
+        for i, ids in enumerate(gene_rooms):
+            self._room_matrix[i, :len(ids)] = ids
+        # Fitness specialization for this problem shape, built once:
+        # dense id-indexed lookup tables replace the per-call dict builds
+        # inside the generic scoring path, and terms that depend only on
+        # static genome columns fold into constants — the teacher column
+        # never varies, so the workload-balance penalty is identical for
+        # every individual.
+        group_students = {g.id: g.student_count for g in self.groups}
+        self._students_col = np.array(
+            [group_students[int(gid)] for gid in self._group_col], dtype=np.int32)
+        self._room_capacity_lut = np.zeros(max((r.id for r in self.rooms), default=0) + 1,
+                                           dtype=np.int32)
+        for r in self.rooms:
+            self._room_capacity_lut[r.id] = r.capacity
+        max_slot_id = max((s.id for s in self.slots), default=0)
+        day_codes = {}
+        self._slot_day_lut = np.zeros(max_slot_id + 1, dtype=np.int16)
+        self._slot_period_lut = np.zeros(max_slot_id + 1, dtype=np.int16)
+        for s in self.slots:
+            self._slot_day_lut[s.id] = day_codes.setdefault(s.day, len(day_codes))
+            self._slot_period_lut[s.id] = s.period
+        loads = np.fromiter(
+            (int((self._teacher_col == t.id).sum()) for t in self.teachers),
+            dtype=np.int16, count=len(self.teachers))
+        self._workload_penalty = float(loads.std()) * 5.0 if loads.size else 0.0
+
+    def _generate_random_individual(self) -> ScheduleSoA:
+        # Two vectorized draws cover the whole genome: one randint batch
+        # for slots, one scaled-uniform batch indexing the room matrix.
+        # Individuals stay columnar end to end; dicts are only
+        # materialized once for the winning schedule in solve().
+        n = len(self._group_col)
+        slot_ids = self._slot_id_arr[np.random.randint(0, len(self._slot_id_arr), size=n)]
+        room_idx = (np.random.random(n) * self._room_counts).astype(np.int64)
+        room_ids = self._room_matrix[np.arange(n), room_idx]
+
+        return ScheduleSoA(
+            teacher_id=self._teacher_col,
+            room_id=room_ids,
+            group_id=self._group_col,
+            slot_id=slot_ids,
+            subject_id=self._subject_col,
+        )
+
+    def _fitness(self, individual: ScheduleSoA) -> float:
+        # Hard constraints: vectorized overlap counts plus a pure array
+        # capacity compare through the precomputed lookup tables
+        slot_ids = individual.slot_id
+        conflicts = HardConstraints.count_teacher_overlap(individual)
+        conflicts += HardConstraints.count_room_overlap(individual)
+        conflicts += int((self._students_col > self._room_capacity_lut[individual.room_id]).sum())
+
+        # Soft constraints: genome slots are never breaks, so day/period
+        # come straight from the LUTs and only gaps/consecutive runs need
+        # computing — the workload term was folded into a constant
+        penalty = self._workload_penalty
+        days = self._slot_day_lut[slot_ids]
+        periods = self._slot_period_lut[slot_ids]
+        masks = defaultdict(int)
+        for tid, day, period in zip(individual.teacher_id.tolist(), days.tolist(), periods.tolist()):
+            if tid <= 0:
+                continue
+            masks[(tid, day)] |= 1 << period
+        for mask in masks.values():
+            classes = mask.bit_count()
+            if classes <= 1:
+                continue
+            first = (mask & -mask).bit_length() - 1
+            last = mask.bit_length() - 1
+            penalty += (last - first + 1 - classes) * 10.0
+            run = _mask_longest_run(mask)
+            if run > 3:
+                penalty += (run - 3) * 8.0
+
+        return max(0.0, 10000.0 - conflicts * 1000 - penalty)
+
+    def _score_batch(self, individuals, pool) -> List[float]:
+        """Score a batch of individuals, on the pool when one is open."""
+        if pool is not None:
+            chunk = max(1, len(individuals) // (4 * (os.cpu_count() or 1)))
+            return list(pool.map(_fitness_worker, individuals, chunksize=chunk))
+        return [self._fitness(ind) for ind in individuals]
 
     def solve(self) -> List[Dict]:
-        population = [self._generate_random_individual() for _ in range(self.pop_size)]
-        
-        for gen in range(self.generations):
-            # Sort by fitness
-            population.sort(key=lambda x: self._fitness(x), reverse=True)
-            
-            if self._fitness(population[0]) >= 10000: # Found a valid one with no soft penalty
-                 break
-                 
-            # Evolve
-            new_population = population[:2] # Elitism
-            
-            while len(new_population) < self.pop_size:
-                # Selection
-                parent1 = self._tournament_selection(population)
-                parent2 = self._tournament_selection(population)
-                
-                # Crossover
-                child = self._crossover(parent1, parent2)
-                
-                # Mutation
-                if random.random() < self.mutation_rate:
-                    child = self._mutate(child)
-                
-                new_population.append(child)
-            
-            population = new_population
-            
-        return population[0]
+        if self.islands > 1:
+            return self._solve_islands()
+
+        pool = None
+        if self.parallel_fitness:
+            pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                initializer=_init_worker,
+                initargs=(self,),
+            )
+        try:
+            # Individuals are immutable between evaluations, so each is
+            # scored exactly once and carried as a (fitness, individual)
+            # pair; sorting, the termination check and tournaments all
+            # read the cached score instead of re-running the constraints
+            # Initial individuals are independent too, so construction
+            # rides the same pool as scoring when one is open
+            if pool is not None:
+                individuals = list(pool.map(_generate_worker, range(self.pop_size)))
+            else:
+                individuals = [self._generate_random_individual() for _ in range(self.pop_size)]
+            population = list(zip(self._score_batch(individuals, pool), individuals))
+
+            # Adaptive sizing: a converged population wastes evaluations,
+            # a stagnant one needs fresh blood. Both signals are read off
+            # the cached scores each generation.
+            min_pop = max(8, self.pop_size // 4)
+            pop_target = self.pop_size
+            last_best = None
+            stagnant = 0
+            converged = 0
+
+            for gen in range(self.generations):
+                # Sort by cached fitness
+                population.sort(key=lambda p: p[0], reverse=True)
+
+                if population[0][0] >= 10000: # Found a valid one with no soft penalty
+                     break
+
+                best = population[0][0]
+                stagnant = stagnant + 1 if last_best is not None and best <= last_best else 0
+                last_best = best
+
+                scores = np.fromiter((p[0] for p in population), dtype=np.float64, count=len(population))
+                converged = converged + 1 if float(scores.std()) < 1.0 else 0
+
+                # Fitness spread collapsed: shrink to the survivors
+                if converged >= 3 and pop_target > min_pop:
+                    pop_target = max(min_pop, pop_target // 2)
+                    population = population[:pop_target]
+                    converged = 0
+
+                # Best flatlined: replace the bottom quarter with random
+                # immigrants to reintroduce diversity
+                if stagnant >= 5:
+                    n_imm = max(1, len(population) // 4)
+                    immigrants = [self._generate_random_individual() for _ in range(n_imm)]
+                    population[-n_imm:] = list(zip(self._score_batch(immigrants, pool), immigrants))
+                    stagnant = 0
+
+                # Evolve: selection only reads the previous generation's
+                # cached scores, so the whole brood is bred in one
+                # fixed-size batch and scored together (in parallel when
+                # the pool is open)
+                children = [self._breed(population) for _ in range(pop_target - 2)]
+
+                # Elitism: the top two carry over unchanged
+                population = population[:2] + list(zip(self._score_batch(children, pool), children))
+
+            return population[0][1].to_dicts()
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    def _evolve_population(self, population, generations):
+        """Run the plain evolve loop on one already-scored population.
+
+        Serial by design: each island calls this inside its own worker
+        process, so the islands themselves are the parallelism.
+        """
+        size = len(population)
+        for _ in range(generations):
+            population.sort(key=lambda p: p[0], reverse=True)
+            if population[0][0] >= 10000:
+                break
+            children = [self._breed(population) for _ in range(size - 2)]
+            population = population[:2] + [(self._fitness(c), c) for c in children]
+        population.sort(key=lambda p: p[0], reverse=True)
+        return population
+
+    def _solve_islands(self) -> List[Dict]:
+        k = self.islands
+        island_pop = max(4, self.pop_size // k)
+        islands = [
+            [(self._fitness(ind), ind)
+             for ind in (self._generate_random_individual() for _ in range(island_pop))]
+            for _ in range(k)
+        ]
+
+        remaining = self.generations
+        with ProcessPoolExecutor(max_workers=k,
+                                 initializer=_init_worker, initargs=(self,)) as pool:
+            while remaining > 0:
+                span = min(self.migration_interval, remaining)
+                futures = [pool.submit(_evolve_island_worker, pop, span) for pop in islands]
+                islands = [f.result() for f in futures]
+                remaining -= span
+
+                if any(pop[0][0] >= 10000 for pop in islands):
+                    break
+
+                # Ring migration: every island's top two replace the next
+                # island's bottom two, so good genes circulate without
+                # collapsing the demes into one population
+                migrants = [pop[:2] for pop in islands]
+                for i, pop in enumerate(islands):
+                    pop[-2:] = migrants[(i - 1) % k]
+
+        best = max((pop[0] for pop in islands), key=lambda p: p[0])
+        return best[1].to_dicts()
+
+    def _breed(self, population):
+        """Select two parents, cross them and maybe mutate the child."""
+        parent1 = self._tournament_selection(population)
+        parent2 = self._tournament_selection(population)
+        child = self._crossover(parent1, parent2)
+        if random.random() < self.mutation_rate:
+            child = self._mutate(child)
+        return child
 
     def _tournament_selection(self, population):
         subset = random.sample(population, 3)
-        return max(subset, key=lambda x: self._fitness(x))
+        return max(subset, key=lambda p: p[0])[1]
 
     def _crossover(self, p1, p2):
+        # Only the slot and room columns vary between individuals; the
+        # splice is two memory-copy concatenations on int arrays, and
+        # the static columns are shared rather than copied
         point = random.randint(0, len(p1)-1)
-        return p1[:point] + p2[point:]
+        return ScheduleSoA(
+            teacher_id=self._teacher_col,
+            room_id=np.concatenate((p1.room_id[:point], p2.room_id[point:])),
+            group_id=self._group_col,
+            slot_id=np.concatenate((p1.slot_id[:point], p2.slot_id[point:])),
+            subject_id=self._subject_col,
+        )
 
     def _mutate(self, ind):
         idx = random.randint(0, len(ind)-1)
-        # Mutate time or room
-        ind[idx]['time_slot_id'] = random.choice(self.slots).id
+        # Mutate time or room; the slot column is freshly allocated by
+        # crossover, so in-place assignment cannot alias a parent
+        ind.slot_id[idx] = random.choice(self.slots).id
         return ind
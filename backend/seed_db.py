@@ -1,55 +1,54 @@
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-import sys
-import os
-
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+# Run from backend/ like the sibling scripts (python seed_db.py); the
+# app package resolves from the working directory, no sys.path games
 from app.infrastructure import models
 from app.infrastructure.database import SQLALCHEMY_DATABASE_URL
 
 def seed_data():
     engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    db = SessionLocal()
+    SessionLocal = sessionmaker(bind=engine)
 
     print("Seeding Reference Data...")
 
-    # 1. Time Slots (Mon-Fri, 9-5)
-    existing_slots = db.query(models.TimeSlot).count()
-    if existing_slots == 0:
-        print("  - Adding TimeSlots...")
-        slots = []
-        for day in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]:
-            for i in range(1, 9): # 8 periods
-                slots.append(models.TimeSlot(
-                    day=day, 
-                    period=i, 
-                    start_time=f"{8+i}:00", 
+    # Plain dicts + bulk_insert_mappings skip ORM object hydration, and
+    # the begin() block wraps the whole seed in one transaction (single
+    # fsync, commit and close handled on exit)
+    with SessionLocal.begin() as db:
+        # 1. Time Slots (Mon-Fri, 9-5)
+        existing_slots = db.query(models.TimeSlot).count()
+        if existing_slots == 0:
+            print("  - Adding TimeSlots...")
+            slots = [
+                dict(
+                    day=day,
+                    period=i,
+                    start_time=f"{8+i}:00",
                     end_time=f"{9+i}:00",
                     is_break=(i==4) # Lunch break at period 4
-                ))
-        db.add_all(slots)
-        db.commit()
-    else:
-        print(f"  - TimeSlots exist ({existing_slots})")
-
-    # 2. Class Groups
-    existing_groups = db.query(models.ClassGroup).count()
-    if existing_groups == 0:
-        print("  - Adding ClassGroups...")
-        groups = [
-            models.ClassGroup(name="SE-AI-DS-A", student_count=60),
-            models.ClassGroup(name="SE-AI-DS-B", student_count=60),
-            models.ClassGroup(name="TE-AI-DS-A", student_count=50)
-        ]
-        db.add_all(groups)
-        db.commit()
-    else:
-        print(f"  - ClassGroups exist ({existing_groups})")
-
-    db.close()
+                )
+                for day in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+                for i in range(1, 9) # 8 periods
+            ]
+            db.bulk_insert_mappings(models.TimeSlot, slots)
+        else:
+            print(f"  - TimeSlots exist ({existing_slots})")
+
+        # 2. Class Groups
+        existing_groups = db.query(models.ClassGroup).count()
+        if existing_groups == 0:
+            print("  - Adding ClassGroups...")
+            groups = [
+                dict(name="SE-AI-DS-A", student_count=60),
+                dict(name="SE-AI-DS-B", student_count=60),
+                dict(name="TE-AI-DS-A", student_count=50)
+            ]
+            db.bulk_insert_mappings(models.ClassGroup, groups)
+        else:
+            print(f"  - ClassGroups exist ({existing_groups})")
+
     print("Seed Complete.")
 
 if __name__ == "__main__":
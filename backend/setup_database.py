@@ -1,105 +1,123 @@
 """
 Complete database initialization and seeding script
 """
+import argparse
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from app.bootstrap import ensure_schema
 from app.infrastructure import models
 from app.infrastructure.database import SQLALCHEMY_DATABASE_URL
 
-def init_and_seed():
+def init_and_seed(reset=False):
     # Create engine and session
     engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-    
-    # Drop all tables and recreate (fresh start)
-    print("🔄 Resetting database...")
-    models.Base.metadata.drop_all(bind=engine)
-    models.Base.metadata.create_all(bind=engine)
-    print("✅ Database tables created!")
+
+    # Only drop when explicitly asked: re-running the script against an
+    # already-initialized database should not wipe it. ensure_schema
+    # also repairs column drift (tables created by an older model
+    # revision), so this path heals a broken database without --reset.
+    if reset:
+        print("🔄 Resetting database...")
+        models.Base.metadata.drop_all(bind=engine)
+        models.Base.metadata.create_all(bind=engine)
+        print("✅ Database tables created!")
+    else:
+        ensure_schema(engine)
+        print("✅ Database schema verified (use --reset to drop and recreate)")
     
     # Create session
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     db = SessionLocal()
     
+    # Already seeded and not resetting: leave the data alone
+    if not reset and db.query(models.TimeSlot).count() > 0:
+        print("📊 Sample data already present, skipping seed.")
+        db.close()
+        return
+    
     try:
         print("\n📊 Adding sample data...")
         
+        # Seed rows are plain dicts fed to bulk_insert_mappings: no ORM
+        # object hydration or identity-map tracking, one executemany per
+        # table, and a single commit so SQLite fsyncs once
+        
         # 1. Time Slots (Mon-Fri, 9AM-5PM)
         print("  ⏰ Adding time slots...")
-        slots = []
-        for day in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]:
-            for i in range(1, 9):  # 8 periods
-                slots.append(models.TimeSlot(
-                    day=day,
-                    period=i,
-                    start_time=f"{8+i}:00",
-                    end_time=f"{9+i}:00",
-                    is_break=(i == 4)  # Lunch break at period 4
-                ))
-        db.add_all(slots)
-        db.commit()
+        slots = [
+            dict(
+                day=day,
+                period=i,
+                start_time=f"{8+i}:00",
+                end_time=f"{9+i}:00",
+                is_break=(i == 4)  # Lunch break at period 4
+            )
+            for day in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+            for i in range(1, 9)  # 8 periods
+        ]
+        db.bulk_insert_mappings(models.TimeSlot, slots)
         print(f"    ✓ Added {len(slots)} time slots")
         
         # 2. Teachers
         print("  👨‍🏫 Adding teachers...")
         teachers = [
-            models.Teacher(name="Dr. Rajesh Kumar", email="rajesh.kumar@college.edu", max_hours_per_week=18),
-            models.Teacher(name="Prof. Priya Sharma", email="priya.sharma@college.edu", max_hours_per_week=16),
-            models.Teacher(name="Dr. Amit Patel", email="amit.patel@college.edu", max_hours_per_week=15),
-            models.Teacher(name="Dr. Sneha Desai", email="sneha.desai@college.edu", max_hours_per_week=14),
-            models.Teacher(name="Prof. Vikram Singh", email="vikram.singh@college.edu", max_hours_per_week=16),
+            dict(name="Dr. Rajesh Kumar", email="rajesh.kumar@college.edu", max_hours_per_week=18),
+            dict(name="Prof. Priya Sharma", email="priya.sharma@college.edu", max_hours_per_week=16),
+            dict(name="Dr. Amit Patel", email="amit.patel@college.edu", max_hours_per_week=15),
+            dict(name="Dr. Sneha Desai", email="sneha.desai@college.edu", max_hours_per_week=14),
+            dict(name="Prof. Vikram Singh", email="vikram.singh@college.edu", max_hours_per_week=16),
         ]
-        db.add_all(teachers)
-        db.commit()
+        db.bulk_insert_mappings(models.Teacher, teachers)
         print(f"    ✓ Added {len(teachers)} teachers")
         
         # 3. Rooms
         print("  🏫 Adding rooms...")
         rooms = [
-            models.Room(name="Room 101", capacity=60, type="LectureHall", resources=["Projector", "Whiteboard"]),
-            models.Room(name="Room 102", capacity=60, type="LectureHall", resources=["Projector", "Whiteboard"]),
-            models.Room(name="Lab 401", capacity=40, type="ComputerLab", resources=["Computers", "Projector"]),
-            models.Room(name="Lab 402", capacity=40, type="ComputerLab", resources=["Computers", "Projector"]),
-            models.Room(name="Conference Hall", capacity=100, type="Auditorium", resources=["Projector", "Sound System"]),
+            dict(name="Room 101", capacity=60, type="LectureHall", resources=["Projector", "Whiteboard"]),
+            dict(name="Room 102", capacity=60, type="LectureHall", resources=["Projector", "Whiteboard"]),
+            dict(name="Lab 401", capacity=40, type="ComputerLab", resources=["Computers", "Projector"]),
+            dict(name="Lab 402", capacity=40, type="ComputerLab", resources=["Computers", "Projector"]),
+            dict(name="Conference Hall", capacity=100, type="Auditorium", resources=["Projector", "Sound System"]),
         ]
-        db.add_all(rooms)
-        db.commit()
+        db.bulk_insert_mappings(models.Room, rooms)
         print(f"    ✓ Added {len(rooms)} rooms")
         
         # 4. Class Groups
         print("  👥 Adding class groups...")
         groups = [
-            models.ClassGroup(name="SE-AI-DS-A", student_count=60),
-            models.ClassGroup(name="SE-AI-DS-B", student_count=55),
-            models.ClassGroup(name="TE-AI-DS-A", student_count=50),
+            dict(name="SE-AI-DS-A", student_count=60),
+            dict(name="SE-AI-DS-B", student_count=55),
+            dict(name="TE-AI-DS-A", student_count=50),
         ]
-        db.add_all(groups)
-        db.commit()
+        db.bulk_insert_mappings(models.ClassGroup, groups)
         print(f"    ✓ Added {len(groups)} class groups")
         
-        # 5. Subjects
+        # 5. Subjects (teacher_id values match the 1..5 insert order above)
         print("  📚 Adding subjects...")
         subjects = [
-            models.Subject(name="Data Structures", code="CS301", is_lab=False, credits=4, 
-                          required_room_type="LectureHall", duration_slots=1, teacher_id=1),
-            models.Subject(name="Database Management", code="CS302", is_lab=False, credits=3,
-                          required_room_type="LectureHall", duration_slots=1, teacher_id=2),
-            models.Subject(name="Database Lab", code="CS302L", is_lab=True, credits=2,
-                          required_room_type="ComputerLab", duration_slots=2, teacher_id=2),
-            models.Subject(name="Machine Learning", code="CS401", is_lab=False, credits=4,
-                          required_room_type="LectureHall", duration_slots=1, teacher_id=3),
-            models.Subject(name="ML Lab", code="CS401L", is_lab=True, credits=2,
-                          required_room_type="ComputerLab", duration_slots=2, teacher_id=3),
-            models.Subject(name="Web Development", code="CS303", is_lab=False, credits=3,
-                          required_room_type="LectureHall", duration_slots=1, teacher_id=4),
-            models.Subject(name="Software Engineering", code="SE201", is_lab=False, credits=4,
-                          required_room_type="LectureHall", duration_slots=1, teacher_id=5),
-            models.Subject(name="SE Project Lab", code="SE201L", is_lab=True, credits=3,
-                          required_room_type="ComputerLab", duration_slots=2, teacher_id=5),
+            dict(name="Data Structures", code="CS301", is_lab=False, credits=4,
+                 required_room_type="LectureHall", duration_slots=1, teacher_id=1),
+            dict(name="Database Management", code="CS302", is_lab=False, credits=3,
+                 required_room_type="LectureHall", duration_slots=1, teacher_id=2),
+            dict(name="Database Lab", code="CS302L", is_lab=True, credits=2,
+                 required_room_type="ComputerLab", duration_slots=2, teacher_id=2),
+            dict(name="Machine Learning", code="CS401", is_lab=False, credits=4,
+                 required_room_type="LectureHall", duration_slots=1, teacher_id=3),
+            dict(name="ML Lab", code="CS401L", is_lab=True, credits=2,
+                 required_room_type="ComputerLab", duration_slots=2, teacher_id=3),
+            dict(name="Web Development", code="CS303", is_lab=False, credits=3,
+                 required_room_type="LectureHall", duration_slots=1, teacher_id=4),
+            dict(name="Software Engineering", code="SE201", is_lab=False, credits=4,
+                 required_room_type="LectureHall", duration_slots=1, teacher_id=5),
+            dict(name="SE Project Lab", code="SE201L", is_lab=True, credits=3,
+                 required_room_type="ComputerLab", duration_slots=2, teacher_id=5),
         ]
-        db.add_all(subjects)
-        db.commit()
+        db.bulk_insert_mappings(models.Subject, subjects)
         print(f"    ✓ Added {len(subjects)} subjects")
         
+        db.commit()
+        
         print("\n✅ Database seeding complete!")
         print("\n📈 Summary:")
         print(f"   - Time Slots: {len(slots)}")
@@ -116,4 +134,8 @@ def init_and_seed():
         db.close()
 
 if __name__ == "__main__":
-    init_and_seed()
+    parser = argparse.ArgumentParser(description="Initialize and seed the timetable database")
+    parser.add_argument("--reset", action="store_true",
+                        help="drop and recreate all tables before seeding")
+    args = parser.parse_args()
+    init_and_seed(reset=args.reset)
@@ -80,8 +80,8 @@ echo ""
 echo "Press Ctrl+C to stop the server"
 echo ""
 
-# Start uvicorn
-uvicorn app.main:app --reload --host 0.0.0.0 --port 8000
+# Start uvicorn (uvloop event loop + httptools parser)
+uvicorn app.main:app --reload --host 0.0.0.0 --port 8000 --loop uvloop --http httptools
 
 # This will only execute when the server stops
 echo ""
@@ -3,11 +3,23 @@ Quick Test Guide for Automated Teacher Substitution
 Run this script to test all auto-assignment features
 """
 
+import functools
 import requests
+from requests.adapters import HTTPAdapter
 import json
 
 BASE_URL = "http://localhost:8000"
 
+# (connect, read) ceilings so a hung backend bounds the script instead
+# of stalling it for the kernel default
+TIMEOUT = (1.0, 5.0)
+
+# One keep-alive session for the whole script: every step reuses the
+# pooled TCP connection instead of paying a handshake per request
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+session.request = functools.partial(session.request, timeout=TIMEOUT)
+
 def test_auto_substitution():
     print("=" * 70)
     print(" TESTING AUTOMATED TEACHER SUBSTITUTION SYSTEM")
@@ -16,7 +28,7 @@ def test_auto_substitution():
     # Step 1: Check server health
     print("\n✅ STEP 1: Checking server health...")
     try:
-        response = requests.get(f"{BASE_URL}/health")
+        response = session.get(f"{BASE_URL}/health")
         health = response.json()
         print(f"   Status: {health['status']}")
         print(f"   Database: {health['database']}")
@@ -30,7 +42,7 @@ def test_auto_substitution():
     # Step 2: Get list of teachers
     print("\n✅ STEP 2: Fetching teachers...")
     try:
-        response = requests.get(f"{BASE_URL}/api/teachers/")
+        response = session.get(f"{BASE_URL}/api/teachers/")
         teachers = response.json()
         print(f"   Found {len(teachers)} teachers:")
         for t in teachers[:3]:
@@ -42,12 +54,12 @@ def test_auto_substitution():
     # Step 3: Generate a timetable if needed
     print("\n✅ STEP 3: Checking/Generating timetable...")
     try:
-        response = requests.get(f"{BASE_URL}/api/timetables/")
+        response = session.get(f"{BASE_URL}/api/timetables/")
         timetables = response.json()
         
         if not timetables:
             print("   No timetable found. Generating one...")
-            response = requests.post(
+            response = session.post(
                 f"{BASE_URL}/api/solvers/generate",
                 json={
                     "algorithm": "csp",
@@ -76,7 +88,7 @@ def test_auto_substitution():
     print("   Let's auto-assign a substitute...\n")
     
     try:
-        response = requests.post(
+        response = session.post(
             f"{BASE_URL}/api/substitutions/auto-assign",
             params={
                 "teacher_id": teacher_id,
@@ -139,7 +151,7 @@ def test_auto_substitution():
     
     try:
         # Get a timetable entry to test with
-        response = requests.get(f"{BASE_URL}/api/timetables/")
+        response = session.get(f"{BASE_URL}/api/timetables/")
         timetables = response.json()
         
         if timetables and timetables[0].get('entries'):
@@ -147,7 +159,7 @@ def test_auto_substitution():
             
             print(f"\n📍 Getting ranked suggestions for entry ID {entry_id}...\n")
             
-            response = requests.get(
+            response = session.get(
                 f"{BASE_URL}/api/substitutions/suggestions/{entry_id}/ranked",
                 params={"top_n": 5}
             )
@@ -188,7 +200,7 @@ def test_auto_substitution():
         print(f"   Date: 2026-02-06\n")
         
         try:
-            response = requests.post(
+            response = session.post(
                 f"{BASE_URL}/api/substitutions/auto-assign-bulk",
                 json={
                     "absences": bulk_absences,
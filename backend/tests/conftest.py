@@ -0,0 +1,154 @@
+"""
+Shared fixtures for the backend test suite.
+
+The API tests run against the FastAPI app in-process via TestClient, so
+no uvicorn server or socket is involved. Each test process points the
+app at its own fresh database file, which the startup hook auto-seeds —
+the suite never touches (or depends on) a developer's timetable.db.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+# Add backend to path so we can import app modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Must be set before app modules are imported: the engine is created at
+# import time from TIMETABLE_DB_URL. One database per process also
+# keeps xdist workers from contending on a single sqlite file.
+os.environ["TIMETABLE_DB_URL"] = "sqlite:///" + os.path.join(
+    tempfile.mkdtemp(prefix="timetable-tests-"), "timetable.db")
+os.environ["AUTO_CREATE_SCHEMA"] = "1"
+
+import httpx
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from app.infrastructure import models
+from app.main import app
+
+# The backend serializes with orjson; decode with it too. Patching
+# Response.json once covers TestClient and AsyncClient alike and makes
+# every response.json() in the suite use the C parser, which is several
+# times faster than stdlib json on the larger timetable payloads.
+httpx.Response.json = lambda self, **_: orjson.loads(self.content)
+
+_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One in-process client shared by every API test in the run.
+
+    raise_server_exceptions=False so handler bugs surface as 500
+    responses, the same way a network client would see them.
+    """
+    with TestClient(app, raise_server_exceptions=False) as client:
+        yield client
+
+
+async def _fetch_domain():
+    """Fetch the teacher and timetable lists concurrently.
+
+    The two GETs are independent, so firing them through one AsyncClient
+    with gather costs the slower dispatch instead of the sum.
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        teachers_resp, timetables_resp = await asyncio.gather(
+            client.get("/api/teachers/"),
+            client.get("/api/timetables/"),
+        )
+    teachers_resp.raise_for_status()
+    timetables_resp.raise_for_status()
+    return teachers_resp.json(), timetables_resp.json()
+
+
+def _domain_cache_path():
+    """Cache file for the seeded domain lists, keyed by the schema.
+
+    Every worker process seeds an identical database, so the first one
+    to fetch the lists can share them with the rest through disk; the
+    schema hash in the name invalidates the cache when models change.
+    """
+    schema_key = hashlib.sha256(
+        ",".join(sorted(models.Base.metadata.tables)).encode()).hexdigest()[:16]
+    return os.path.join(_CACHE_DIR, f"domain-{schema_key}.json")
+
+
+@pytest.fixture(scope="session")
+def _domain_lists(client):
+    # Depends on client so the app's startup auto-seed has already run
+    cache_path = _domain_cache_path()
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    data = asyncio.run(_fetch_domain())
+
+    # Atomic replace so concurrent xdist workers never read a half-written file
+    os.makedirs(_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, cache_path)
+    return data
+
+
+@pytest.fixture(scope="session")
+def teachers(_domain_lists):
+    """Teacher list, fetched once per run (read-only within the suite)."""
+    data = _domain_lists[0]
+    if not data:
+        pytest.skip("no teachers in database; run setup_database.py first")
+    return data
+
+
+@pytest.fixture(scope="session")
+def monday_teacher_id(client, timetables):
+    """Id of a teacher who actually teaches on Monday.
+
+    Looked up once through the filtered teachers endpoint instead of
+    hardcoding an id and hoping the generated timetable agrees.
+    """
+    data = client.get("/api/teachers/", params={"has_monday_class": 1}).json()
+    if not data:
+        pytest.skip("no teacher has a Monday class in the generated timetable")
+    return data[0]["id"]
+
+
+@pytest.fixture(scope="session")
+def timetables(_domain_lists, client):
+    """Timetable version list, generating one first when none exist.
+
+    The solver expands lessons, so on a freshly seeded database one
+    lesson is created before triggering generation.
+    """
+    data = _domain_lists[1]
+    if not data:
+        if not client.get("/api/lessons/").json():
+            subject = client.get("/api/subjects/").json()[0]
+            group = client.get("/api/class-groups/").json()[0]
+            r = client.post("/api/lessons/", json={
+                "teacher_ids": [subject["teacher_id"]],
+                "subject_ids": [subject["id"]],
+                "class_group_ids": [group["id"]],
+                "lessons_per_week": 2,
+                "length_per_lesson": 1,
+            })
+            assert r.status_code == 200, r.text
+        r = client.post("/api/solvers/generate",
+                        params={"method": "csp", "name": "Test Timetable"})
+        if r.status_code != 200:
+            pytest.skip(f"could not generate a timetable: {r.text}")
+        data = client.get("/api/timetables/").json()
+    if not data:
+        pytest.skip("no timetables in database")
+    return data
@@ -37,7 +37,8 @@ async function checkBackendStatus() {
 // Load database statistics
 async function loadStats() {
     try {
-        const response = await fetch(`${API_BASE}/health`);
+        // Counts moved off /health (kept O(1) for liveness probes) to /stats
+        const response = await fetch(`${API_BASE}/stats`);
         const data = await response.json();
 
         document.getElementById('teacherCount').textContent = data.teachers || '0';